@@ -0,0 +1,147 @@
+"""Dashboard actions applied to many users at once.
+
+Each action is a constant number of statements however many users are
+selected: one UPDATE for block/unblock, a DELETE and a bulk INSERT on the
+groups through table for group changes. Deletes remove the users' tasks
+first, in chunks (see delete_users).
+
+These bypass the User and membership signals, so every function refreshes
+the dashboard counters and role caches itself. Each returns
+``(affected, skipped)``: how many users changed, and a list of
+``(username, reason)`` for the selected users that were left alone.
+"""
+from django.contrib.auth import get_user_model
+from django.db import connection, transaction
+from django.db.models import Q
+
+from tasks.cache import bump_task_list_version
+from tasks.models import Task
+
+from .cache import invalidate_groups
+from .forms import ADMIN_GROUP_NAME, USER_GROUP_NAME, ensure_group
+from .stats import invalidate_user_stats
+
+User = get_user_model()
+
+# Tasks removed per DELETE statement (and transaction) when deleting users,
+# so the write lock is released between chunks.
+DELETE_CHUNK_SIZE = 1000
+
+# Owner ids per `owner_id IN (...)` list, well under SQLite's variable limit.
+OWNER_CHUNK_SIZE = 500
+
+
+def _partition(actor, users, allow_self=False, allow_superusers=False):
+    """Split `users` into (targets, skipped) by the rules every bulk action shares."""
+    targets, skipped = [], []
+    for user in users:
+        if user.pk == actor.pk and not allow_self:
+            skipped.append((user.username, "your own account"))
+        elif user.is_superuser and not allow_superusers:
+            skipped.append((user.username, "superuser"))
+        else:
+            targets.append(user)
+    return targets, skipped
+
+
+def set_active(actor, users, active):
+    """Block (active=False) or unblock `users` with a single UPDATE."""
+    targets, skipped = _partition(actor, users)
+    for user in targets:
+        if user.is_active == active:
+            skipped.append((user.username, "already active" if active else "already blocked"))
+    pks = [user.pk for user in targets if user.is_active != active]
+    affected = User.objects.filter(pk__in=pks).update(is_active=active) if pks else 0
+    if affected:
+        invalidate_user_stats()
+    return affected, skipped
+
+
+def assign_group(actor, users, selected):
+    """Put `users` in group `selected` ("admin", "user" or "none"), replacing the other role group."""
+    # Only superusers can modify superusers.
+    targets, skipped = _partition(actor, users, allow_self=True, allow_superusers=actor.is_superuser)
+    pks = {user.pk for user in targets}
+
+    # Last-admin rule: the actor may only give up the admin role while an
+    # active admin remains among the users this action doesn't demote.
+    if selected != ADMIN_GROUP_NAME and actor.pk in pks and not actor.is_superuser:
+        remaining = (
+            User.objects.filter(is_active=True)
+            .exclude(pk__in=[user.pk for user in targets if not user.is_superuser])
+            .filter(Q(is_superuser=True) | Q(groups__name=ADMIN_GROUP_NAME))
+        )
+        if not remaining.exists():
+            pks.discard(actor.pk)
+            skipped.append((actor.username, "you are the last admin"))
+    if not pks:
+        return 0, skipped
+
+    admin_group, user_group = ensure_group(ADMIN_GROUP_NAME), ensure_group(USER_GROUP_NAME)
+    Membership = User.groups.through
+    with transaction.atomic():
+        Membership.objects.filter(user_id__in=pks, group__in=[admin_group, user_group]).delete()
+        if selected in (ADMIN_GROUP_NAME, USER_GROUP_NAME):
+            group = admin_group if selected == ADMIN_GROUP_NAME else user_group
+            Membership.objects.bulk_create(Membership(user_id=pk, group_id=group.pk) for pk in pks)
+        if selected == ADMIN_GROUP_NAME:
+            # As in AssignGroupForm.apply: admins get staff UX.
+            User.objects.filter(pk__in=pks).update(is_staff=True)
+
+    invalidate_groups(pks)
+    invalidate_user_stats()
+    return len(pks), skipped
+
+
+def delete_tasks_of(owner_ids, chunk_size=DELETE_CHUNK_SIZE):
+    """Hard-delete every task (live or soft-deleted) of `owner_ids`; return the count.
+
+    Raw chunked DELETEs: QuerySet.delete() would load every row to send
+    post_delete, and a single statement would hold the write lock for the
+    whole run on a user with a hundred thousand tasks.
+    """
+    table = Task._meta.db_table
+    owner_ids = list(owner_ids)
+    deleted = 0
+    for start in range(0, len(owner_ids), OWNER_CHUNK_SIZE):
+        chunk = owner_ids[start:start + OWNER_CHUNK_SIZE]
+        placeholders = ", ".join(["%s"] * len(chunk))
+        sql = (
+            f"DELETE FROM {table} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE owner_id IN ({placeholders}) LIMIT %s)"
+        )
+        while True:
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, [*chunk, chunk_size])
+                count = cursor.rowcount
+            deleted += count
+            if count < chunk_size:
+                break
+    return deleted
+
+
+def delete_users(actor, users):
+    """Delete `users` and everything they own.
+
+    Not atomic, by design: the tasks go first, one committed chunk at a
+    time, and the users only after that. If a statement fails partway the
+    DatabaseError propagates with the users still there and some or all of
+    their tasks deleted. Running the deletion again finishes the job.
+    """
+    targets, skipped = _partition(actor, users)
+    if not targets:
+        return 0, skipped
+
+    pks = [user.pk for user in targets]
+    try:
+        delete_tasks_of(pks)
+        # With the tasks gone, the collector only has a profile, group rows
+        # and admin log entries per user left to cascade to.
+        User.objects.filter(pk__in=pks).delete()
+    finally:
+        # Chunks committed before a failure are gone too.
+        for pk in pks:
+            bump_task_list_version(pk)
+    invalidate_groups(pks)
+    invalidate_user_stats()
+    return len(pks), skipped
@@ -0,0 +1,117 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+ADMIN_GROUP_NAME = "admin"
+
+# Seconds a cached profile is kept. Signals invalidate earlier on change.
+PROFILE_CACHE_TIMEOUT = getattr(settings, "ACCOUNTS_PROFILE_CACHE_TIMEOUT", 60 * 15)
+
+# Seconds cached group names are kept. Kept short because permission checks
+# read them: with a per-process cache, this is how long other workers can
+# still see a role that was just removed.
+ROLE_CACHE_TIMEOUT = getattr(settings, "ACCOUNTS_ROLE_CACHE_TIMEOUT", 30)
+
+# Attribute memoizing group names on a user object for the rest of the request.
+_REQUEST_ATTR = "_cached_group_names"
+
+_GLOBAL_GROUPS_VERSION_KEY = "accounts:groups_version"
+
+
+def _profile_key(user_id) -> str:
+    return f"accounts:profile:{user_id}"
+
+
+def _user_groups_version_key(user_id) -> str:
+    return f"accounts:groups_version:{user_id}"
+
+
+def get_profile(user):
+    """Return the user's Profile, creating it if needed, from the cache when possible."""
+    key = _profile_key(user.pk)
+    profile = cache.get(key)
+    if profile is None:
+        from .models import Profile
+        profile, _ = Profile.objects.get_or_create(user=user)
+        cache.set(key, profile, PROFILE_CACHE_TIMEOUT)
+    return profile
+
+
+def invalidate_profile(user_id) -> None:
+    cache.delete(_profile_key(user_id))
+
+
+# ---------- Role cache ----------
+def _new_version() -> int:
+    # Seeded from the clock so a version key that was evicted never comes back
+    # with a number an older (stale) entry was stored under.
+    return time.time_ns()
+
+
+def _groups_key(user_id) -> str:
+    version_keys = [_GLOBAL_GROUPS_VERSION_KEY, _user_groups_version_key(user_id)]
+    versions = cache.get_many(version_keys)
+    for key in version_keys:
+        if key not in versions:
+            versions[key] = _new_version()
+            cache.set(key, versions[key], None)
+    return f"accounts:groups:{user_id}:{versions[version_keys[0]]}:{versions[version_keys[1]]}"
+
+
+def get_group_names(user) -> frozenset:
+    """Names of the groups `user` belongs to.
+
+    Memoized on the user object for the current request and in the cache
+    framework across requests, keyed by per-user and global version counters
+    that are bumped whenever memberships or groups change.
+
+    The bumps only reach the cache of the process that made the change, so
+    with a per-process cache other workers keep the old names until the entry
+    expires, after at most ROLE_CACHE_TIMEOUT seconds.
+    """
+    if not user.is_authenticated:
+        return frozenset()
+    names = getattr(user, _REQUEST_ATTR, None)
+    if names is None:
+        key = _groups_key(user.pk)
+        names = cache.get(key)
+        if names is None:
+            names = frozenset(user.groups.values_list("name", flat=True))
+            cache.set(key, names, ROLE_CACHE_TIMEOUT)
+        setattr(user, _REQUEST_ATTR, names)
+    return names
+
+
+def has_group(user, group_name: str) -> bool:
+    return group_name in get_group_names(user)
+
+
+def is_admin(user) -> bool:
+    """True for superusers and members of the 'admin' group."""
+    return user.is_superuser or has_group(user, ADMIN_GROUP_NAME)
+
+
+def _bump(key) -> None:
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), None)
+
+
+def forget_groups(user) -> None:
+    """Clear the per-request memo on a user object whose groups just changed."""
+    # request.user is a SimpleLazyObject; the memo lives on the wrapped user.
+    state = getattr(getattr(user, "_wrapped", user), "__dict__", {})
+    state.pop(_REQUEST_ATTR, None)
+
+
+def invalidate_groups(user_ids) -> None:
+    """Drop cached group names for the given users."""
+    for pk in user_ids:
+        _bump(_user_groups_version_key(pk))
+
+
+def invalidate_all_groups() -> None:
+    """Drop cached group names for every user (a group was renamed or deleted)."""
+    _bump(_GLOBAL_GROUPS_VERSION_KEY)
@@ -51,12 +51,12 @@ class AdminUserCreateForm(UserCreationForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-none focus:ring-2 focus:ring-emerald-500"
+        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-hidden focus:ring-2 focus:ring-emerald-500"
         self.fields["username"].widget.attrs.update({"class": common, "placeholder": "john_doe"})
         self.fields["email"].widget.attrs.update({"class": common, "placeholder": "john@example.com"})
         self.fields["password1"].widget.attrs.update({"class": common + " pr-10"})
         self.fields["password2"].widget.attrs.update({"class": common + " pr-10"})
-        self.fields["is_staff"].widget.attrs.update({"class": "h-4 w-4 rounded"})
+        self.fields["is_staff"].widget.attrs.update({"class": "h-4 w-4 rounded-sm"})
         self.fields["group"].widget.attrs.update({"class": common})
 
     def clean_email(self):
@@ -98,7 +98,7 @@ class PublicSignUpForm(UserCreationForm):
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-none focus:ring-2 focus:ring-emerald-500"
+        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-hidden focus:ring-2 focus:ring-emerald-500"
         self.fields["username"].widget.attrs.update({"class": common, "placeholder": "john_doe"})
         self.fields["email"].widget.attrs.update({"class": common, "placeholder": "john@example.com"})
         self.fields["password1"].widget.attrs.update({"class": common + " pr-10"})
@@ -114,7 +114,7 @@ class PublicSignUpForm(UserCreationForm):
 class StyledAuthenticationForm(AuthenticationForm):
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-none focus:ring-2 focus:ring-emerald-500"
+        common = "w-full rounded-xl border border-gray-300 px-4 py-2 focus:outline-hidden focus:ring-2 focus:ring-emerald-500"
         self.fields["username"].widget.attrs.update({"class": common, "placeholder": "username"})
         self.fields["password"].widget.attrs.update({"class": common + " pr-10", "placeholder": "password"})
 
@@ -135,3 +135,24 @@ class AssignGroupForm(forms.Form):
             # don't force staff here
 
         target_user.save(update_fields=["is_staff"])
+
+
+class BulkUserActionForm(forms.Form):
+    """Dashboard multi-select: one action applied to the checked users."""
+
+    ACTION_CHOICES = [
+        ("block", "Block"),
+        ("unblock", "Unblock"),
+        ("assign_group", "Set group"),
+        ("delete", "Delete"),
+    ]
+
+    action = forms.ChoiceField(choices=ACTION_CHOICES)
+    group = forms.ChoiceField(choices=GROUP_CHOICES, required=False)
+    users = forms.ModelMultipleChoiceField(queryset=User.objects.all())
+
+    def clean(self):
+        cleaned = super().clean()
+        if cleaned.get("action") == "assign_group" and not cleaned.get("group"):
+            self.add_error("group", "Choose a group to assign.")
+        return cleaned
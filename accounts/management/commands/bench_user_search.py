@@ -0,0 +1,70 @@
+import random
+import statistics
+import string
+import time
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+
+from accounts.search import has_search_index, search_users
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark dashboard user search (icontains vs FTS5 trigram index) on a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500_000, help='Number of synthetic users')
+        parser.add_argument('--repeat', type=int, default=20, help='Timed runs per search term')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated dataset')
+
+    def handle(self, *args, **options):
+        # Never touch the real database: build and drop a test database around the run.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            if not has_search_index():
+                self.stderr.write('FTS5 trigram index is unavailable on this database; nothing to compare.')
+                return
+            terms = self._seed(options['users'], options['seed'])
+            for term in terms:
+                self._compare(term, options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, n_users, seed):
+        rng = random.Random(seed)
+        password = make_password(None)
+        started = time.perf_counter()
+        batch = []
+        for i in range(n_users):
+            name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(5, 10)))
+            batch.append(User(username=f'{name}{i}', email=f'{name}.{i}@example{i % 50}.com', password=password))
+            if len(batch) >= 10_000:
+                User.objects.bulk_create(batch)
+                batch = []
+        User.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {n_users} users in {time.perf_counter() - started:.1f}s")
+
+        sample = User.objects.order_by('?').values_list('username', flat=True).first()
+        return [sample[:4], sample, 'example7', 'zzzzqq']
+
+    def _compare(self, term, repeat):
+        base = User.objects.order_by('-date_joined')
+        like = base.filter(Q(username__icontains=term) | Q(email__icontains=term))
+        fts = search_users(base, term)
+        for label, qs in (('icontains', like), ('fts5', fts)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                # What the dashboard runs: the paginator count plus the first page.
+                count = qs.count()
+                list(qs[:10])
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{term!r:<20} {label:<10} matches={count:>7}  "
+                f"p50={statistics.median(timings):8.2f}ms  max={max(timings):8.2f}ms"
+            )
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from accounts.models import Profile
+from accounts.thumbnails import generate_thumbnails
+
+
+class Command(BaseCommand):
+    help = 'Generate missing avatar thumbnails (e.g. for avatars uploaded before thumbnails existed)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true', help='Regenerate and overwrite thumbnails that already exist')
+
+    def handle(self, *args, **options):
+        profiles = Profile.objects.exclude(avatar='').exclude(avatar__isnull=True).only('avatar', 'avatar_thumbnails')
+        done = failed = 0
+        for profile in profiles.iterator():
+            if not options['force'] and profile.avatar_thumbnails.get('source') == profile.avatar.name:
+                continue
+            try:
+                generate_thumbnails(profile.pk, profile.avatar.name, force=options['force'])
+                done += 1
+            except (OSError, ValueError) as e:
+                failed += 1
+                self.stderr.write(f"Profile {profile.pk} ({profile.avatar.name}): {e}")
+        self.stdout.write(self.style.SUCCESS(f"Generated thumbnails for {done} avatars ({failed} failed)."))
@@ -0,0 +1,49 @@
+from django.conf import settings
+from django.db import DatabaseError, migrations
+
+SEARCH_TABLE = "accounts_user_search"
+
+
+def create_user_search(apps, schema_editor):
+    """Create an FTS5 trigram index over username/email.
+
+    SQLite only (3.34+ for the trigram tokenizer). Other backends, or SQLite
+    builds without it, skip this and the dashboard keeps using icontains.
+    The sync triggers are installed after every migrate by
+    accounts.search.install_search_triggers, because SQLite drops triggers
+    whenever a later migration rebuilds the user table.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    user_table = apps.get_model(settings.AUTH_USER_MODEL)._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                f"username, email, content='{user_table}', content_rowid='id', tokenize='trigram')"
+            )
+        except DatabaseError:
+            pass
+
+
+def drop_user_search(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('accounts', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(create_user_search, drop_user_search),
+    ]
@@ -1,8 +1,13 @@
 from django.db import models
 from django.contrib.auth import get_user_model
-from django.db.models.signals import post_save
+from django.contrib.auth.models import Group
+from django.db.models.signals import m2m_changed, post_delete, post_init, post_save
 from django.dispatch import receiver
 
+from .cache import forget_groups, invalidate_all_groups, invalidate_groups, invalidate_profile
+from .stats import USER_STATS_CACHE, apply_user_change, remember_flags
+from .thumbnails import schedule_thumbnails
+
 User = get_user_model()
 
 class Profile(models.Model):
@@ -10,12 +15,83 @@ class Profile(models.Model):
     full_name = models.CharField(max_length=120, blank=True)
     bio = models.TextField(blank=True)
     avatar = models.ImageField(upload_to="avatars/", blank=True, null=True)
+    # Resized copies of the avatar, filled in the background by accounts.thumbnails:
+    # {"source": <avatar name>, "small": {"webp": <name>, "jpeg": <name>}, "large": {...}}
+    avatar_thumbnails = models.JSONField(default=dict, blank=True, editable=False)
     timezone = models.CharField(max_length=64, blank=True)
+    # Part of the task list's ETag/Last-Modified: the page header shows the profile.
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"Profile({self.user.username})"
 
+    def _thumbnail(self, size):
+        if not self.avatar or self.avatar_thumbnails.get("source") != self.avatar.name:
+            return None
+        storage = self.avatar.storage
+        return {ext: storage.url(name) for ext, name in self.avatar_thumbnails.get(size, {}).items()}
+
+    @property
+    def small_avatar(self):
+        """URLs of the header-size avatar by format, or None until they are generated."""
+        return self._thumbnail("small")
+
+    @property
+    def large_avatar(self):
+        return self._thumbnail("large")
+
 @receiver(post_save, sender=User)
 def create_profile_for_user(sender, instance, created, **kwargs):
     if created:
         Profile.objects.get_or_create(user=instance)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_cached_profile(sender, instance, **kwargs):
+    invalidate_profile(instance.user_id)
+
+
+@receiver(post_save, sender=Profile)
+def refresh_avatar_thumbnails(sender, instance, **kwargs):
+    if instance.avatar and instance.avatar_thumbnails.get("source") != instance.avatar.name:
+        schedule_thumbnails(instance)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+def invalidate_cached_groups(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ("post_add", "post_remove", "pre_clear"):
+        return
+    if not reverse:
+        # user.groups.add/remove/clear(...)
+        forget_groups(instance)
+        invalidate_groups([instance.pk])
+    elif pk_set is not None:
+        # group.user_set.add/remove(...)
+        invalidate_groups(pk_set)
+    else:
+        # group.user_set.clear(): members are only known before the clear
+        invalidate_groups(instance.user_set.values_list("pk", flat=True))
+
+
+@receiver([post_save, post_delete], sender=Group)
+def invalidate_cached_group_names(sender, **kwargs):
+    invalidate_all_groups()
+
+
+# Dashboard counter cache (ACCOUNTS_USER_STATS_CACHE); see accounts.stats.
+@receiver(post_init, sender=User)
+def remember_user_stat_flags(sender, instance, **kwargs):
+    if USER_STATS_CACHE:
+        remember_flags(instance)
+
+
+@receiver(post_save, sender=User)
+def update_user_stats_on_save(sender, instance, created, **kwargs):
+    if USER_STATS_CACHE:
+        apply_user_change(instance, created=created)
+
+
+@receiver(post_delete, sender=User)
+def update_user_stats_on_delete(sender, instance, **kwargs):
+    if USER_STATS_CACHE:
+        apply_user_change(instance, deleted=True)
@@ -0,0 +1,74 @@
+from functools import lru_cache
+
+from django.contrib.auth import get_user_model
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+
+# FTS5 trigram table created by accounts/migrations/0002_user_search_fts.py.
+SEARCH_TABLE = "accounts_user_search"
+
+# Trigram matching needs at least three characters; shorter terms use LIKE.
+MIN_QUERY_LENGTH = 3
+
+_TRIGGERS = {
+    f"{SEARCH_TABLE}_ai": (
+        "AFTER INSERT ON {users} BEGIN "
+        "INSERT INTO {fts}(rowid, username, email) VALUES (new.id, new.username, new.email); END"
+    ),
+    f"{SEARCH_TABLE}_ad": (
+        "AFTER DELETE ON {users} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); END"
+    ),
+    f"{SEARCH_TABLE}_au": (
+        "AFTER UPDATE OF username, email ON {users} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, username, email) VALUES ('delete', old.id, old.username, old.email); "
+        "INSERT INTO {fts}(rowid, username, email) VALUES (new.id, new.username, new.email); END"
+    ),
+}
+
+
+def install_search_triggers(using="default") -> None:
+    """(Re)create the triggers that keep the search table in sync with the user table.
+
+    SQLite drops a table's triggers when a migration rebuilds it, so this runs
+    after every migrate. If any trigger was missing the index is rebuilt,
+    since rows may have changed while it was not maintained.
+    """
+    conn = connections[using]
+    if conn.vendor != "sqlite" or SEARCH_TABLE not in conn.introspection.table_names():
+        return
+    users = get_user_model()._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [users]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} " + _TRIGGERS[name].format(users=users, fts=SEARCH_TABLE))
+        if missing:
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+
+@lru_cache(maxsize=None)
+def _search_index_available(db_name) -> bool:
+    return SEARCH_TABLE in connection.introspection.table_names()
+
+
+def has_search_index() -> bool:
+    return connection.vendor == "sqlite" and _search_index_available(str(connection.settings_dict["NAME"]))
+
+
+def search_users(queryset, q):
+    """Filter `queryset` to users whose username or email contains `q`.
+
+    Uses the FTS5 trigram index when it exists, so substring search is an
+    index lookup instead of a LIKE '%q%' table scan; otherwise falls back to
+    icontains.
+    """
+    if len(q) >= MIN_QUERY_LENGTH and has_search_index():
+        phrase = '"' + q.replace('"', '""') + '"'
+        matches = RawSQL(f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s", [phrase])
+        return queryset.filter(pk__in=matches)
+    return queryset.filter(Q(username__icontains=q) | Q(email__icontains=q))
@@ -0,0 +1,88 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models import Count, Q
+
+User = get_user_model()
+
+# When enabled, the dashboard header counts live in the cache and are adjusted
+# by User signals instead of being aggregated on every page view.
+USER_STATS_CACHE = getattr(settings, "ACCOUNTS_USER_STATS_CACHE", False)
+
+STAT_NAMES = ("total_users", "active_users", "blocked_users", "staff_users")
+
+_KEYS = {name: f"accounts:user_stats:{name}" for name in STAT_NAMES}
+
+
+def compute_user_stats() -> dict:
+    """All four dashboard counts in a single conditional aggregate."""
+    return User.objects.aggregate(
+        total_users=Count("pk"),
+        active_users=Count("pk", filter=Q(is_active=True)),
+        blocked_users=Count("pk", filter=Q(is_active=False)),
+        staff_users=Count("pk", filter=Q(is_staff=True)),
+    )
+
+
+def get_user_stats() -> dict:
+    if not USER_STATS_CACHE:
+        return compute_user_stats()
+
+    cached = cache.get_many(_KEYS.values())
+    if len(cached) == len(_KEYS):
+        return {name: cached[key] for name, key in _KEYS.items()}
+
+    stats = compute_user_stats()
+    cache.set_many({_KEYS[name]: value for name, value in stats.items()}, None)
+    return stats
+
+
+def invalidate_user_stats() -> None:
+    """Force a recount on next read. Call after queryset update()/delete() on users,
+    which bypass the signals that keep the counters in step."""
+    cache.delete_many(_KEYS.values())
+
+
+_FLAG_FIELDS = {"is_active", "is_staff"}
+
+
+def _flags(user) -> dict:
+    return {
+        "total_users": 1,
+        "active_users": int(user.is_active),
+        "blocked_users": int(not user.is_active),
+        "staff_users": int(user.is_staff),
+    }
+
+
+def remember_flags(user) -> None:
+    # Reading a deferred flag would cost a query per instance (only()/defer()
+    # querysets); without the snapshot, a later save just forces a recount.
+    if _FLAG_FIELDS & user.get_deferred_fields():
+        user._stats_flags = None
+    else:
+        user._stats_flags = _flags(user)
+
+
+def apply_user_change(user, created=False, deleted=False) -> None:
+    """Adjust the cached counters for a saved or deleted user."""
+    if created:
+        old, new = dict.fromkeys(STAT_NAMES, 0), _flags(user)
+    elif deleted:
+        old, new = _flags(user), dict.fromkeys(STAT_NAMES, 0)
+    else:
+        old = getattr(user, "_stats_flags", None)
+        if old is None:
+            invalidate_user_stats()
+            return
+        new = _flags(user)
+
+    try:
+        for name in STAT_NAMES:
+            delta = new[name] - old[name]
+            if delta:
+                cache.incr(_KEYS[name], delta)
+    except ValueError:
+        # A counter is missing (never computed or evicted): recount lazily.
+        invalidate_user_stats()
+    remember_flags(user)
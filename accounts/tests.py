@@ -1,3 +1,315 @@
-from django.test import TestCase
+import tempfile
+import time
+from io import BytesIO, StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.db.models.query import QuerySet
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import reverse
+from django.utils.functional import SimpleLazyObject
+from PIL import Image
+
+from tasks.models import Task
+from todo.testing import PLAIN_STATIC
+
+from .bulk import delete_tasks_of
+from .cache import ROLE_CACHE_TIMEOUT, forget_groups, get_group_names, get_profile
+from .context_processors import ensure_profile
+from .forms import ADMIN_GROUP_NAME, USER_GROUP_NAME, ensure_group
+from .models import Profile
+from .search import has_search_index, search_users
+from .stats import remember_flags
+from .thumbnails import THUMBNAIL_DIR, THUMBNAIL_SIZES
+
+User = get_user_model()
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class RoleCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin1", password="pw")
+        self.admin.groups.set([ensure_group(ADMIN_GROUP_NAME)])
+
+    def test_demotion_takes_effect_at_once(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse("accounts:dashboard")).status_code, 200)
+
+        self.admin.groups.clear()
+
+        self.assertEqual(self.client.get(reverse("accounts:dashboard")).status_code, 302)
+
+    def test_unsignalled_change_is_seen_once_the_cache_expires(self):
+        self.client.force_login(self.admin)
+        self.assertEqual(self.client.get(reverse("accounts:dashboard")).status_code, 200)
+
+        # As if another worker demoted the admin: the rows change, this
+        # process's cached group names do not.
+        User.groups.through.objects.filter(user=self.admin).delete()
+        self.assertEqual(self.client.get(reverse("accounts:dashboard")).status_code, 200)
+
+        later = time.time() + ROLE_CACHE_TIMEOUT + 1
+        with mock.patch("django.core.cache.backends.locmem.time.time", return_value=later):
+            self.assertEqual(self.client.get(reverse("accounts:dashboard")).status_code, 302)
+
+    def test_forget_groups_clears_lazy_request_user(self):
+        user = SimpleLazyObject(lambda: self.admin)
+        get_group_names(user)
+        self.assertIn("_cached_group_names", vars(self.admin))
+
+        forget_groups(user)
+
+        self.assertNotIn("_cached_group_names", vars(self.admin))
+
+    def test_forget_groups_on_unevaluated_lazy_user(self):
+        forget_groups(SimpleLazyObject(lambda: self.admin))
+
+
+class ProfileCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.get(pk=self.user.pk)
+
+    def test_context_is_lazy(self):
+        with self.assertNumQueries(0):
+            ensure_profile(self.request)
+
+    def test_profile_is_cached_until_saved(self):
+        get_profile(self.user)
+        with self.assertNumQueries(0):
+            context = ensure_profile(self.request)
+            self.assertEqual(context["profile"].full_name, "")
+
+        profile = Profile.objects.get(user=self.user)
+        profile.full_name = "Alice A."
+        profile.save()
+
+        self.assertEqual(get_profile(self.user).full_name, "Alice A.")
+
+    def test_admin_flag_follows_group_changes(self):
+        self.assertFalse(ensure_profile(self.request)["is_admin"])
+
+        self.user.groups.add(ensure_group(ADMIN_GROUP_NAME))
+
+        request_user = User.objects.get(pk=self.user.pk)
+        self.request.user = request_user
+        self.assertTrue(ensure_profile(self.request)["is_admin"])
+        with self.assertNumQueries(0):
+            # Memoized on the user for the rest of the request.
+            self.assertTrue(ensure_profile(self.request)["is_admin"])
+
+
+class UserSearchTests(TestCase):
+    def setUp(self):
+        self.alice = User.objects.create_user("alice.smith", email="alice@example.com")
+        self.bob = User.objects.create_user("bob", email="bob@work.example.org")
+
+    def search(self, q):
+        return set(search_users(User.objects.all(), q))
+
+    def test_substring_of_username_or_email(self):
+        self.assertTrue(has_search_index())
+        self.assertEqual(self.search("SMITH"), {self.alice})
+        self.assertEqual(self.search("work.exa"), {self.bob})
+        self.assertEqual(self.search("example"), {self.alice, self.bob})
+        self.assertEqual(self.search('"quoted"'), set())
+
+    def test_index_follows_updates_and_deletes(self):
+        self.bob.username = "robert"
+        self.bob.save()
+        self.assertEqual(self.search("robert"), {self.bob})
+        self.assertEqual(self.search("bob@"), {self.bob})
+
+        self.bob.delete()
+        self.assertEqual(self.search("robert"), set())
+
+    def test_short_terms_fall_back_to_icontains(self):
+        self.assertEqual(self.search("Bo"), {self.bob})
+
+
+class AvatarThumbnailTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        media_settings = override_settings(MEDIA_ROOT=media.name)
+        media_settings.enable()
+        self.addCleanup(media_settings.disable)
+
+        buffer = BytesIO()
+        Image.new("RGB", (300, 200), "teal").save(buffer, "PNG")
+        self.profile = User.objects.create_user("alice").profile
+        self.profile.avatar = SimpleUploadedFile("me.png", buffer.getvalue(), content_type="image/png")
+        self.profile.save()
+
+    def generate(self, *args):
+        call_command("generate_avatar_thumbnails", *args, stdout=StringIO(), stderr=StringIO())
+        self.profile.refresh_from_db()
+        return self.profile.avatar_thumbnails
+
+    def test_generates_missing_thumbnails(self):
+        thumbnails = self.generate()
+
+        self.assertEqual(thumbnails["source"], self.profile.avatar.name)
+        storage = self.profile.avatar.storage
+        for size, edge in THUMBNAIL_SIZES.items():
+            with storage.open(thumbnails[size]["jpeg"]) as f, Image.open(f) as image:
+                self.assertEqual(image.size, (edge, edge))
+        self.assertTrue(self.profile.small_avatar["jpeg"].endswith(thumbnails["small"]["jpeg"]))
+
+    def test_force_overwrites_existing_files(self):
+        path = self.generate()["small"]["jpeg"]
+        storage = self.profile.avatar.storage
+        with open(storage.path(path), "wb") as f:
+            f.write(b"stale")
+
+        self.generate()
+        with storage.open(path) as f:
+            self.assertEqual(f.read(), b"stale")
+
+        thumbnails = self.generate("--force")
+        self.assertEqual(thumbnails["small"]["jpeg"], path)
+        with storage.open(path) as f, Image.open(f) as image:
+            self.assertEqual(image.format, "JPEG")
+        # Overwritten in place, not saved next to the old file under a new name.
+        files = sum(len(thumbnails[size]) for size in THUMBNAIL_SIZES)
+        self.assertEqual(len(storage.listdir(THUMBNAIL_DIR)[1]), files)
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class DeleteUserTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin1", password="pw")
+        self.admin.groups.set([ensure_group(ADMIN_GROUP_NAME)])
+        self.client.force_login(self.admin)
+        self.target = User.objects.create_user("bob")
+        Task.objects.bulk_create(Task(owner=self.target, title=f"Task {i}") for i in range(25))
+
+    def test_delete_user(self):
+        response = self.client.post(reverse("accounts:delete_user", args=[self.target.pk]), follow=True)
+
+        self.assertContains(response, "Deleted bob.")
+        self.assertFalse(User.objects.filter(pk=self.target.pk).exists())
+        self.assertFalse(Task.all_objects.filter(owner_id=self.target.pk).exists())
+
+    def test_tasks_are_deleted_in_chunks(self):
+        # Tombstoned tasks go too.
+        Task.objects.filter(pk__in=Task.objects.filter(owner=self.target).values("pk")[:5]).soft_delete()
+        other = Task.objects.create(owner=self.admin, title="Mine")
+
+        self.assertEqual(delete_tasks_of([self.target.pk], chunk_size=10), 25)
+
+        self.assertEqual(list(Task.all_objects.values_list("pk", flat=True)), [other.pk])
+
+    def test_failure_partway_is_reported(self):
+        with mock.patch.object(QuerySet, "delete", side_effect=DatabaseError):
+            response = self.client.post(reverse("accounts:delete_user", args=[self.target.pk]), follow=True)
+
+        self.assertContains(response, "failed partway")
+        self.assertTrue(User.objects.filter(pk=self.target.pk).exists())
+        self.assertFalse(Task.all_objects.filter(owner_id=self.target.pk).exists())
+
+
+class UserStatFlagsTests(TestCase):
+    def test_deferred_flags_are_not_loaded(self):
+        User.objects.create_user("carol")
+
+        user = User.objects.only("username").get(username="carol")
+        with self.assertNumQueries(0):
+            remember_flags(user)
+        self.assertIsNone(user._stats_flags)
+
+        user = User.objects.get(username="carol")
+        remember_flags(user)
+        self.assertEqual(user._stats_flags["active_users"], 1)
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class BulkUserActionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_user("admin1", password="pw")
+        self.admin.groups.set([ensure_group(ADMIN_GROUP_NAME)])
+        self.superuser = User.objects.create_superuser("root", "root@example.com", "pw")
+        self.users = [User.objects.create_user(f"user{i}") for i in range(3)]
+        self.client.force_login(self.admin)
+
+    def bulk(self, action, users, group=""):
+        response = self.client.post(
+            reverse("accounts:bulk_users"), {"action": action, "group": group, "users": [u.pk for u in users]}
+        )
+        self.assertRedirects(response, reverse("accounts:dashboard"), fetch_redirect_response=False)
+        return [str(m) for m in get_messages(response.wsgi_request)][-1]
+
+    def test_block_and_unblock_skip_self_and_superusers(self):
+        message = self.bulk("block", [*self.users, self.admin, self.superuser])
+
+        self.assertIn("Blocked 3 users.", message)
+        self.assertIn("admin1 (your own account)", message)
+        self.assertIn("root (superuser)", message)
+        self.assertEqual(set(User.objects.filter(is_active=False)), set(self.users))
+
+        self.assertEqual(self.bulk("unblock", self.users), "Unblocked 3 users.")
+        self.assertFalse(User.objects.filter(is_active=False).exists())
+
+    def test_assign_group(self):
+        self.bulk("assign_group", self.users[:2], ADMIN_GROUP_NAME)
+
+        promoted = User.objects.filter(groups__name=ADMIN_GROUP_NAME, pk__in=[u.pk for u in self.users])
+        self.assertEqual(set(promoted), set(self.users[:2]))
+        self.assertTrue(all(user.is_staff for user in promoted))
+
+        self.bulk("assign_group", self.users[:2], "none")
+        self.assertFalse(User.objects.filter(groups__isnull=False, pk__in=[u.pk for u in self.users]).exists())
+
+    def test_assign_group_requires_a_group(self):
+        message = self.bulk("assign_group", self.users)
+
+        self.assertEqual(message, "Select at least one user and an action.")
+
+    def test_only_superusers_change_superusers(self):
+        message = self.bulk("assign_group", [self.superuser], USER_GROUP_NAME)
+        self.assertIn("root (superuser)", message)
+
+        self.client.force_login(self.superuser)
+        self.bulk("assign_group", [self.superuser], USER_GROUP_NAME)
+        self.assertTrue(self.superuser.groups.filter(name=USER_GROUP_NAME).exists())
+
+    def test_last_admin_keeps_the_role(self):
+        self.superuser.delete()
+        other = self.users[0]
+        other.groups.set([ensure_group(ADMIN_GROUP_NAME)])
+
+        message = self.bulk("assign_group", [self.admin, other], USER_GROUP_NAME)
+
+        self.assertIn("admin1 (you are the last admin)", message)
+        self.assertTrue(self.admin.groups.filter(name=ADMIN_GROUP_NAME).exists())
+        self.assertFalse(other.groups.filter(name=ADMIN_GROUP_NAME).exists())
+
+    def test_delete_users_and_their_tasks(self):
+        for user in self.users:
+            Task.objects.bulk_create(Task(owner=user, title=f"Task {i}") for i in range(5))
+        Task.objects.create(owner=self.admin, title="Mine")
+
+        message = self.bulk("delete", [*self.users[:2], self.admin])
+
+        self.assertIn("Deleted 2 users.", message)
+        self.assertEqual(set(User.objects.filter(username__startswith="user")), {self.users[2]})
+        self.assertEqual(Task.all_objects.filter(owner__in=self.users[:2]).count(), 0)
+        self.assertEqual(Task.all_objects.count(), 6)
+
+    def test_requires_admin(self):
+        self.client.force_login(self.users[0])
+
+        response = self.client.post(reverse("accounts:bulk_users"), {"action": "block", "users": [self.users[1].pk]})
+
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(User.objects.get(pk=self.users[1].pk).is_active)
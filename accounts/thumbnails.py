@@ -0,0 +1,98 @@
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+from PIL import Image, ImageOps, features
+
+from .cache import invalidate_profile
+
+logger = logging.getLogger(__name__)
+
+# Square thumbnail edge in pixels, by name. Rendered at half size so they
+# stay sharp on 2x screens: "small" for the 32px header avatar, "large" for
+# the 64-80px avatars on the profile pages.
+THUMBNAIL_SIZES = {"small": 64, "large": 160}
+
+# (extension, Pillow format, save options). WebP first, JPEG as the fallback.
+FORMATS = (
+    ("webp", "WEBP", {"quality": 80, "method": 6}),
+    ("jpeg", "JPEG", {"quality": 85, "optimize": True, "progressive": True}),
+)
+
+THUMBNAIL_DIR = "avatars/thumbs"
+
+# Uploads are resized off the request thread, a few at a time.
+_executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "ACCOUNTS_THUMBNAIL_WORKERS", 2), thread_name_prefix="avatar-thumbs"
+)
+
+
+def schedule_thumbnails(profile) -> None:
+    """Generate `profile`'s avatar thumbnails in the background once the save commits."""
+    pk, source = profile.pk, profile.avatar.name
+    transaction.on_commit(lambda: _executor.submit(_generate_in_background, pk, source))
+
+
+def _generate_in_background(profile_pk, source):
+    try:
+        generate_thumbnails(profile_pk, source)
+    except Exception:
+        logger.exception("Avatar thumbnails failed for profile %s", profile_pk)
+    finally:
+        # Not a request thread, so nothing else closes its connection.
+        close_old_connections()
+
+
+def generate_thumbnails(profile_pk, source, force=False) -> bool:
+    """Write every thumbnail of avatar file `source` and record them on the profile.
+
+    Names are derived from the image content, so they never change for a
+    given upload and can be cached forever; files that already exist are
+    kept unless `force` is set (e.g. after changing FORMATS options).
+    Returns False if the profile has moved on to another avatar in the
+    meantime.
+    """
+    from .models import Profile
+
+    profile = Profile.objects.filter(pk=profile_pk).only("avatar", "user_id").first()
+    if profile is None or profile.avatar.name != source:
+        return False
+
+    storage = profile.avatar.storage
+    with storage.open(source, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()[:16]
+    with Image.open(BytesIO(data)) as original:
+        image = ImageOps.exif_transpose(original).convert("RGB")
+
+    thumbnails = {"source": source}
+    for name, edge in THUMBNAIL_SIZES.items():
+        thumb = ImageOps.fit(image, (edge, edge), Image.Resampling.LANCZOS)
+        thumbnails[name] = {}
+        for ext, pil_format, options in FORMATS:
+            if pil_format == "WEBP" and not features.check("webp"):
+                continue
+            path = f"{THUMBNAIL_DIR}/{digest}-{edge}.{ext}"
+            exists = storage.exists(path)
+            if exists and force:
+                # save() would pick a new name rather than overwrite.
+                storage.delete(path)
+            if force or not exists:
+                buffer = BytesIO()
+                thumb.save(buffer, pil_format, **options)
+                path = storage.save(path, ContentFile(buffer.getvalue()))
+            thumbnails[name][ext] = path
+
+    # Only if the avatar is still the one we resized. update() skips the
+    # Profile signals, so drop the cached copy by hand.
+    updated = Profile.objects.filter(pk=profile_pk, avatar=source).update(
+        avatar_thumbnails=thumbnails, updated_at=timezone.now()
+    )
+    if updated:
+        invalidate_profile(profile.user_id)
+    return bool(updated)
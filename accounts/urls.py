@@ -8,6 +8,7 @@ from .views import (
     unblock_user,
     delete_user,
     assign_group,
+    bulk_users,
     signup,
     home,
     logout_view,
@@ -23,6 +24,7 @@ urlpatterns = [
     path("users/<int:user_id>/unblock/", unblock_user, name="unblock_user"),
     path("users/<int:user_id>/delete/", delete_user, name="delete_user"),
     path("users/<int:user_id>/assign-group/", assign_group, name="assign_group"),
+    path("users/bulk/", bulk_users, name="bulk_users"),
     path("profile/", profile_detail, name="profile"),
     path("profile/edit/", profile_edit, name="profile_edit"),
     # Auth
@@ -4,20 +4,25 @@ from django.contrib.auth import logout as auth_logout
 from django.contrib.auth.decorators import user_passes_test, login_required
 from django.contrib.auth.models import Group
 from django.contrib.auth.views import LoginView
-from django.db.models import Q
+from django.db import DatabaseError
+from django.db.models import Exists, OuterRef, Q
 from django.http import Http404
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse_lazy
 from django.utils.http import url_has_allowed_host_and_scheme
 from django.views.decorators.http import require_http_methods, require_POST
 from django.core.paginator import Paginator, EmptyPage, PageNotAnInteger
-from django.db.models import Q
+from . import bulk
+from .cache import has_group
+from .search import search_users
+from .stats import get_user_stats
 from .forms import ProfileForm 
 from .forms import (
     AdminUserCreateForm,
     PublicSignUpForm,
     StyledAuthenticationForm,
     AssignGroupForm,
+    BulkUserActionForm,
 )
 
 User = get_user_model()
@@ -25,6 +30,12 @@ User = get_user_model()
 ADMIN_GROUP_NAME = "admin"
 USER_GROUP_NAME = "user"
 
+# See bulk.delete_users: tasks are deleted in committed chunks before the accounts.
+PARTIAL_DELETE_HINT = (
+    "The accounts still exist, but some of their tasks may already be deleted. "
+    "Delete them again to finish."
+)
+
 
 # ---------- Group helpers ----------
 def ensure_group(name: str) -> Group:
@@ -32,14 +43,19 @@ def ensure_group(name: str) -> Group:
     return group
 
 def _in_group(user, group_name: str) -> bool:
-    return user.is_authenticated and user.groups.filter(name=group_name).exists()
+    # Cached names; see accounts.cache.get_group_names for how stale they can be.
+    return user.is_authenticated and has_group(user, group_name)
 
-def _admin_count_excluding(user_to_exclude=None) -> int:
-    qs = User.objects.filter(is_active=True).distinct()
-    qs = qs.filter(Q(is_superuser=True) | Q(groups__name=ADMIN_GROUP_NAME))
-    if user_to_exclude is not None:
-        qs = qs.exclude(pk=user_to_exclude.pk)
-    return qs.count()
+def _other_admin_exists(user_to_exclude) -> bool:
+    """True if an active admin other than `user_to_exclude` exists.
+
+    Two indexed EXISTS probes instead of a COUNT over a DISTINCT join.
+    """
+    others = User.objects.filter(is_active=True).exclude(pk=user_to_exclude.pk)
+    return (
+        others.filter(is_superuser=True).exists()
+        or others.filter(groups__name=ADMIN_GROUP_NAME).exists()
+    )
 
 def admin_required(view_func):
     """
@@ -138,9 +154,14 @@ def dashboard(request):
     if per_page not in (10, 25, 50, 100):
         per_page = 10
 
-    users_qs = User.objects.all().order_by("-date_joined").prefetch_related("groups")
+    # Group membership is folded into the page query as EXISTS subqueries.
+    memberships = User.groups.through.objects.filter(user_id=OuterRef("pk"))
+    users_qs = User.objects.order_by("-date_joined").annotate(
+        in_admin_group=Exists(memberships.filter(group__name=ADMIN_GROUP_NAME)),
+        in_user_group=Exists(memberships.filter(group__name=USER_GROUP_NAME)),
+    )
     if q:
-        users_qs = users_qs.filter(Q(username__icontains=q) | Q(email__icontains=q))
+        users_qs = search_users(users_qs, q)
 
     paginator = Paginator(users_qs, per_page)
     try:
@@ -150,22 +171,9 @@ def dashboard(request):
     except EmptyPage:
         page_obj = paginator.page(paginator.num_pages)
 
-    # compute memberships for just the current page (efficient)
-    page_user_ids = [u.id for u in page_obj.object_list]
-    admin_group_ids = list(
-        User.objects.filter(id__in=page_user_ids, groups__name=ADMIN_GROUP_NAME)
-        .values_list("id", flat=True)
-    )
-    user_group_ids = list(
-        User.objects.filter(id__in=page_user_ids, groups__name=USER_GROUP_NAME)
-        .values_list("id", flat=True)
-    )
-
     context = {
-        "total_users": User.objects.count(),
-        "active_users": User.objects.filter(is_active=True).count(),
-        "blocked_users": User.objects.filter(is_active=False).count(),
-        "staff_users": User.objects.filter(is_staff=True).count(),
+        # total / active / blocked / staff counts, one aggregate (or cached counters)
+        **get_user_stats(),
 
         "users": page_obj.object_list,
         "page_obj": page_obj,
@@ -173,51 +181,10 @@ def dashboard(request):
 
         "q": q,
         "per_page": per_page,
-
-        # NEW: lists you can use with "in" in the template
-        "admin_group_ids": admin_group_ids,
-        "user_group_ids": user_group_ids,
     }
     return render(request, "accounts/dashboard.html", context)
 
-    q = (request.GET.get("q") or "").strip()
-    page = request.GET.get("page") or 1
-    per_page = request.GET.get("per_page") or 10
-    try:
-        per_page = int(per_page)
-    except ValueError:
-        per_page = 10
-    if per_page not in (10, 25, 50, 100):
-        per_page = 10
-
-    users_qs = User.objects.all().order_by("-date_joined")
-    if q:
-        users_qs = users_qs.filter(Q(username__icontains=q) | Q(email__icontains=q))
-
-    paginator = Paginator(users_qs, per_page)
-    try:
-        page_obj = paginator.page(page)
-    except PageNotAnInteger:
-        page_obj = paginator.page(1)
-    except EmptyPage:
-        page_obj = paginator.page(paginator.num_pages)
 
-    context = {
-        "total_users": User.objects.count(),
-        "active_users": User.objects.filter(is_active=True).count(),
-        "blocked_users": User.objects.filter(is_active=False).count(),
-        "staff_users": User.objects.filter(is_staff=True).count(),
-
-        # table data
-        "users": page_obj.object_list,
-        "page_obj": page_obj,
-        "paginator": paginator,
-
-        # search + paging state
-        "q": q,
-        "per_page": per_page,
-    }
-    return render(request, "accounts/dashboard.html", context)
 @admin_required
 @require_http_methods(["GET", "POST"])
 def create_user(request):
@@ -245,7 +212,7 @@ def assign_group(request, user_id):
 
     # Prevent demoting yourself if you'd be the last admin
     if target == request.user and selected != ADMIN_GROUP_NAME:
-        if _admin_count_excluding(user_to_exclude=request.user) == 0:
+        if not _other_admin_exists(request.user):
             messages.error(request, "You are the last admin. Create another admin before demoting yourself.")
             return redirect("accounts:dashboard")
 
@@ -310,10 +277,58 @@ def delete_user(request, user_id):
         messages.error(request, "Refusing to delete a superuser.")
         return redirect("accounts:dashboard")
 
-    username = target.username
-    target.delete()
-    messages.success(request, f"Deleted {username}.")
+    # Tasks go in chunked raw DELETEs instead of through the collector.
+    try:
+        bulk.delete_users(request.user, [target])
+    except DatabaseError:
+        messages.error(request, f"Deleting {target.username} failed partway. {PARTIAL_DELETE_HINT}")
+        return redirect("accounts:dashboard")
+    messages.success(request, f"Deleted {target.username}.")
+    return redirect("accounts:dashboard")
+
+
+@admin_required
+@require_POST
+def bulk_users(request):
+    """Apply one dashboard action to every checked user.
+
+    Same rules as the per-user actions: never yourself (except for group
+    changes, within the last-admin rule), and superusers only by superusers.
+    """
+    form = BulkUserActionForm(request.POST)
+    if not form.is_valid():
+        messages.error(request, "Select at least one user and an action.")
+        return redirect("accounts:dashboard")
+
+    action = form.cleaned_data["action"]
+    users = list(form.cleaned_data["users"])
+    if action == "block":
+        count, skipped = bulk.set_active(request.user, users, False)
+        done = "Blocked"
+    elif action == "unblock":
+        count, skipped = bulk.set_active(request.user, users, True)
+        done = "Unblocked"
+    elif action == "assign_group":
+        group = form.cleaned_data["group"]
+        count, skipped = bulk.assign_group(request.user, users, group)
+        done = f"Set group to {group} for"
+    else:
+        try:
+            count, skipped = bulk.delete_users(request.user, users)
+        except DatabaseError:
+            messages.error(request, f"Deleting the selected users failed partway. {PARTIAL_DELETE_HINT}")
+            return redirect("accounts:dashboard")
+        done = "Deleted"
+
+    # The dashboard shows one message, so the outcome goes in a single one.
+    summary = f"{done} {count} user{'s' if count != 1 else ''}."
+    if skipped:
+        details = ", ".join(f"{username} ({reason})" for username, reason in skipped)
+        messages.warning(request, f"{summary} Skipped {len(skipped)}: {details}.")
+    else:
+        messages.success(request, summary)
     return redirect("accounts:dashboard")
+
 @login_required
 @require_http_methods(["GET", "POST"])
 def profile_edit(request):
@@ -1,6 +1,15 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def _install_search_triggers(sender, using, **kwargs):
+    from .search import install_search_triggers
+    install_search_triggers(using)
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
+
+    def ready(self):
+        post_migrate.connect(_install_search_triggers, sender=self)
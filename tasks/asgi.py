@@ -0,0 +1,73 @@
+"""ASGI front for the live task event stream (tasks.events).
+
+Django runs every request in its own thread-sensitive context, which keeps
+an OS thread alive for as long as the request is open. That is fine for
+normal requests but makes each idle event stream cost a thread. TaskEventsApp
+answers the stream path itself: it authenticates from the session cookie in
+a shared worker thread, then streams on the event loop with no thread held.
+Every other request goes to the wrapped Django application.
+"""
+import asyncio
+from importlib import import_module
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user
+from django.db import close_old_connections
+from django.http import HttpRequest
+from django.http.cookie import parse_cookie
+from django.urls import reverse
+
+from .events import event_stream
+
+
+def _get_user(session_key):
+    request = HttpRequest()
+    request.session = import_module(settings.SESSION_ENGINE).SessionStore(session_key)
+    try:
+        return get_user(request)
+    finally:
+        # Outside the request cycle, so nothing else would close the connection.
+        close_old_connections()
+
+
+class TaskEventsApp:
+    def __init__(self, application):
+        self.application = application
+        self.path = reverse("tasks:task_events")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] != self.path:
+            return await self.application(scope, receive, send)
+
+        cookies = parse_cookie(dict(scope["headers"]).get(b"cookie", b"").decode("latin-1"))
+        session_key = cookies.get(settings.SESSION_COOKIE_NAME)
+        user = await sync_to_async(_get_user, thread_sensitive=False)(session_key) if session_key else None
+        if scope["method"] != "GET" or user is None or not user.is_authenticated:
+            await send({"type": "http.response.start", "status": 403, "headers": []})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        })
+        streaming = asyncio.create_task(self._stream(user.pk, send))
+        disconnected = asyncio.create_task(self._wait_for_disconnect(receive))
+        await asyncio.wait({streaming, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+        for task in (streaming, disconnected):
+            task.cancel()
+        await asyncio.gather(streaming, disconnected, return_exceptions=True)
+
+    async def _stream(self, owner_id, send):
+        async for chunk in event_stream(owner_id):
+            await send({"type": "http.response.body", "body": chunk.encode(), "more_body": True})
+
+    async def _wait_for_disconnect(self, receive):
+        while (await receive())["type"] != "http.disconnect":
+            pass
@@ -0,0 +1,196 @@
+"""Async versions of the task views, served when TASKS_ASYNC_VIEWS is on.
+
+Under an ASGI server these run on the event loop and reach the database
+through the async ORM, instead of each request hopping to a worker thread
+for the whole view. Behaviour and responses match tasks.views.
+
+The user is always read with ``await request.auser()``: touching the lazy
+``request.user`` would load it with a synchronous query.
+"""
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib import messages
+from django.contrib.auth.decorators import login_required
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, HttpResponseBadRequest, JsonResponse, StreamingHttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import redirect, render
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+
+from .batch import TOGGLE_COMPLETED
+from .cache import TASK_LIST_CACHE_TIMEOUT, atask_list_fragment_key
+from .conditional import aadd_validators, acondition, atask_json_validators, atask_list_validators
+from .events import event_stream
+from .forms import TaskForm
+from .models import Task
+from .pagination import DEFAULT_PAGE_SIZE, apaginate_tasks
+from .views import (  # noqa: F401 (sync only: raw SQL / transactions)
+    _task_json,
+    _tasks_changed,
+    task_batch,
+    task_export,
+    task_import,
+    task_search,
+)
+
+# Runs in the ORM's thread, so on_commit sees the same connection as the update.
+_atasks_changed = sync_to_async(_tasks_changed)
+
+
+@login_required
+@acondition(atask_list_validators)
+async def task_list(request):
+    """See tasks.views.task_list."""
+    user = await request.auser()
+    # Context processors read request.user; don't let them load it synchronously.
+    request.user = user
+    form = TaskForm(request.POST or None)
+
+    if request.method == "POST":
+        if form.is_valid():
+            task = form.save(commit=False)
+            task.owner = user
+            await task.asave()
+            messages.success(request, "Task added.")
+            return redirect("tasks:task_list")
+
+    cursor = request.GET.get("after")
+    get_token(request)
+    key = await atask_list_fragment_key(user.pk, cursor, request.META["CSRF_COOKIE"])
+    task_items = await cache.aget(key)
+    if task_items is None:
+        page_size = getattr(settings, "TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+        tasks, next_cursor = await apaginate_tasks(
+            Task.objects.filter(owner=user), cursor=cursor, page_size=page_size
+        )
+        task_items = render_to_string(
+            "tasks/includes/task_items.html",
+            {"tasks": tasks, "next_cursor": next_cursor, "is_first_page": not cursor},
+            request=request,
+        )
+        await cache.aset(key, task_items, TASK_LIST_CACHE_TIMEOUT)
+
+    # The page header reads the profile through a context processor, which
+    # may query the database, so the full page is rendered in a thread.
+    return await sync_to_async(render)(
+        request, "tasks/task_list.html", {"form": form, "task_items": mark_safe(task_items)}
+    )
+
+
+@login_required
+@acondition(atask_json_validators)
+async def task_list_json(request):
+    """See tasks.views.task_list_json."""
+    user = await request.auser()
+    cursor = request.GET.get('after')
+    page_size = getattr(settings, "TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    tasks, next_cursor = await apaginate_tasks(Task.objects.filter(owner=user), cursor=cursor, page_size=page_size)
+    return JsonResponse({'tasks': [_task_json(task) for task in tasks], 'next_cursor': next_cursor})
+
+
+@login_required
+async def toggle_task(request, pk):
+    """See tasks.views.toggle_task. Flips the task with one UPDATE."""
+    if request.method != "POST":
+        return redirect("tasks:task_list")
+
+    user = await request.auser()
+    updated = await Task.objects.filter(pk=pk, owner=user).aupdate(
+        completed=TOGGLE_COMPLETED, updated_at=timezone.now()
+    )
+    if not updated:
+        raise Http404("No Task matches the given query.")
+    await _atasks_changed(user.pk, [pk])
+    return redirect("tasks:task_list")
+
+
+@login_required
+async def toggle_task_ajax(request, pk):
+    """See tasks.views.toggle_task_ajax."""
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    user = await request.auser()
+    tasks = Task.objects.filter(pk=pk, owner=user)
+    now = timezone.now()
+    expected = request.POST.get('completed')
+    if expected in ('true', 'false'):
+        was_completed = expected == 'true'
+        updated = await tasks.filter(completed=was_completed).aupdate(completed=not was_completed, updated_at=now)
+        if updated:
+            completed = not was_completed
+        else:
+            current = await tasks.values_list('completed', flat=True).afirst()
+            if current is None:
+                return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+            return JsonResponse({'status': 'conflict', 'task': {'id': pk, 'completed': current}}, status=409)
+    else:
+        if not await tasks.aupdate(completed=TOGGLE_COMPLETED, updated_at=now):
+            return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+        completed = await tasks.values_list('completed', flat=True).afirst()
+
+    await _atasks_changed(user.pk, [pk])
+    data = {'id': pk, 'completed': completed, 'updated_at': now.isoformat()}
+    return await aadd_validators(JsonResponse({'status': 'ok', 'task': data}), user)
+
+
+@login_required
+async def delete_task(request, pk):
+    """See tasks.views.delete_task."""
+    if request.method != "POST":
+        return redirect("tasks:task_list")
+
+    user = await request.auser()
+    if not await Task.objects.filter(pk=pk, owner=user).asoft_delete():
+        raise Http404("No Task matches the given query.")
+    await _atasks_changed(user.pk, [pk])
+    messages.success(request, "Task deleted.")
+    return redirect("tasks:task_list")
+
+
+@login_required
+async def delete_task_ajax(request, pk):
+    """See tasks.views.delete_task_ajax."""
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    user = await request.auser()
+    if not await Task.objects.filter(pk=pk, owner=user).asoft_delete():
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    await _atasks_changed(user.pk, [pk])
+    return await aadd_validators(JsonResponse({'status': 'ok', 'task': {'id': pk}}), user)
+
+
+@login_required
+async def undo_delete(request, pk):
+    """See tasks.views.undo_delete."""
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    user = await request.auser()
+    if not await Task.all_objects.filter(pk=pk, owner=user).arestore():
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    await _atasks_changed(user.pk, [pk], "create")
+    return await aadd_validators(JsonResponse({'status': 'ok', 'task_id': pk}), user)
+
+
+@login_required
+async def task_events(request):
+    """Server-Sent Events stream of the current user's task changes (see tasks.events).
+
+    Under todo.asgi this path is answered by tasks.asgi.TaskEventsApp before
+    it reaches Django; this view covers other ASGI setups. Under WSGI a worker
+    would be tied up for the life of the stream, so it gets 204 instead,
+    which tells EventSource not to reconnect.
+    """
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+
+    user = await request.auser()
+    response = StreamingHttpResponse(event_stream(user.pk), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"  # nginx: don't buffer the stream
+    return response
@@ -0,0 +1,173 @@
+from collections import Counter, defaultdict
+
+from django.db import transaction
+from django.db.models import Case, Value, When
+from django.utils import timezone
+
+from .forms import TaskForm
+from .models import Task
+
+MAX_BATCH_OPERATIONS = 500
+
+# Operations run in request order. Consecutive operations of the same kind
+# are applied together, so a run costs a constant number of queries however
+# many items it holds.
+OPERATIONS = ("create", "toggle", "set_priority", "delete", "complete_all", "clear_completed")
+ITEM_OPERATIONS = ("toggle", "set_priority", "delete")
+
+PRIORITIES = {value for value, _ in Task.PRIORITY_CHOICES}
+
+# Task ids are stored as 64-bit signed integers.
+MAX_TASK_ID = 2**63 - 1
+
+# UPDATE expression that flips `completed` in SQL, without loading the row.
+TOGGLE_COMPLETED = Case(When(completed=True, then=Value(False)), default=Value(True))
+
+
+class BatchError(ValueError):
+    """Raised when the batch payload itself is malformed."""
+
+
+def _ok(index, op, **extra):
+    return {"index": index, "op": op, "status": "ok", **extra}
+
+
+def _error(index, op, message, **extra):
+    return {"index": index, "op": op, "status": "error", "message": message, **extra}
+
+
+def _task_id(item):
+    try:
+        pk = int(item.get("id"))
+    except (TypeError, ValueError):
+        return None
+    # Larger values overflow the database driver instead of matching nothing.
+    return pk if -MAX_TASK_ID - 1 <= pk <= MAX_TASK_ID else None
+
+
+def apply_batch(owner, operations):
+    """Apply a list of task operations for `owner` in a single transaction.
+
+    Each operation is a dict with an ``op`` key (one of OPERATIONS) plus its
+    arguments. Returns one result dict per operation, in request order.
+    """
+    if not isinstance(operations, list):
+        raise BatchError("'operations' must be a list")
+    if len(operations) > MAX_BATCH_OPERATIONS:
+        raise BatchError(f"At most {MAX_BATCH_OPERATIONS} operations per batch")
+
+    results = [None] * len(operations)
+    runs = []  # [op, [(index, item), ...]] for consecutive valid operations of one kind
+    for index, item in enumerate(operations):
+        op = item.get("op") if isinstance(item, dict) else None
+        if op not in OPERATIONS:
+            results[index] = _error(index, op, "Unknown operation")
+            continue
+        if op in ITEM_OPERATIONS and _task_id(item) is None:
+            results[index] = _error(index, op, "Missing or invalid id")
+            continue
+        if runs and runs[-1][0] == op:
+            runs[-1][1].append((index, item))
+        else:
+            runs.append([op, [(index, item)]])
+
+    with transaction.atomic():
+        tasks = Task.objects.filter(owner=owner)
+
+        # One lookup resolves every id referenced by the batch, scoped to the
+        # owner; ids leave the set as delete/clear_completed remove their tasks.
+        ids = {_task_id(item) for op, items in runs if op in ITEM_OPERATIONS for _, item in items}
+        owned = set(tasks.filter(pk__in=ids).values_list("pk", flat=True)) if ids else set()
+
+        def resolve(op, items):
+            found = []
+            for index, item in items:
+                pk = _task_id(item)
+                if pk in owned:
+                    found.append((index, item, pk))
+                else:
+                    results[index] = _error(index, op, "Task not found", id=pk)
+            return found
+
+        for op, items in runs:
+            if op == "create":
+                _create(owner, items, results)
+            elif op == "toggle":
+                _toggle(tasks, resolve(op, items), results)
+            elif op == "set_priority":
+                _set_priority(tasks, resolve(op, items), results)
+            elif op == "delete":
+                owned -= _delete(tasks, resolve(op, items), results)
+            elif op == "complete_all":
+                for index, _ in items:
+                    count = tasks.filter(completed=False).update(completed=True, updated_at=timezone.now())
+                    results[index] = _ok(index, op, count=count)
+            else:
+                for index, _ in items:
+                    if owned:
+                        owned -= set(tasks.filter(pk__in=owned, completed=True).values_list("pk", flat=True))
+                    count = tasks.filter(completed=True).soft_delete()
+                    results[index] = _ok(index, op, count=count)
+
+    return results
+
+
+def _create(owner, items, results):
+    pending = []
+    for index, item in items:
+        form = TaskForm(
+            {
+                "title": item.get("title"),
+                "due_date": item.get("due_date"),
+                "priority": item.get("priority") or "medium",
+            }
+        )
+        if form.is_valid():
+            task = form.save(commit=False)
+            task.owner = owner
+            pending.append((index, task))
+        else:
+            results[index] = _error(index, "create", "Invalid task", errors=form.errors)
+
+    created = Task.objects.bulk_create([task for _, task in pending])
+    for (index, _), task in zip(pending, created):
+        results[index] = _ok(index, "create", id=task.pk)
+
+
+def _toggle(tasks, items, results):
+    # Toggling a task twice in one batch is a no-op, so only odd counts flip.
+    flips = Counter(pk for _, _, pk in items)
+    flip_ids = [pk for pk, n in flips.items() if n % 2]
+    if flip_ids:
+        tasks.filter(pk__in=flip_ids).update(
+            completed=TOGGLE_COMPLETED,
+            updated_at=timezone.now(),
+        )
+    for index, _, pk in items:
+        results[index] = _ok(index, "toggle", id=pk)
+
+
+def _set_priority(tasks, items, results):
+    final = {}  # pk -> priority; the last operation on a task wins
+    for index, item, pk in items:
+        priority = item.get("priority")
+        if priority not in PRIORITIES:
+            results[index] = _error(index, "set_priority", "Invalid priority", id=pk)
+            continue
+        final[pk] = priority
+        results[index] = _ok(index, "set_priority", id=pk, priority=priority)
+    by_priority = defaultdict(list)
+    for pk, priority in final.items():
+        by_priority[priority].append(pk)
+    for priority, pks in by_priority.items():
+        tasks.filter(pk__in=pks).update(priority=priority, updated_at=timezone.now())
+
+
+def _delete(tasks, items, results):
+    """Soft-delete the run's tasks; return their ids."""
+    pks = {pk for _, _, pk in items}
+    if pks:
+        tasks.filter(pk__in=pks).soft_delete()
+    for index, _, pk in items:
+        results[index] = _ok(index, "delete", id=pk)
+    return pks
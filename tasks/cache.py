@@ -0,0 +1,69 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Seconds a rendered task list fragment is kept. Any change to the owner's
+# tasks bumps their version, so stale fragments are simply never read again.
+TASK_LIST_CACHE_TIMEOUT = getattr(settings, "TASK_LIST_CACHE_TIMEOUT", 60 * 5)
+
+
+def _version_key(owner_id) -> str:
+    return f"tasks:list_version:{owner_id}"
+
+
+def get_task_list_version(owner_id) -> int:
+    key = _version_key(owner_id)
+    version = cache.get(key)
+    if version is None:
+        # Seeded from the clock so an evicted counter never reuses an old version.
+        version = time.time_ns()
+        cache.set(key, version, None)
+    return version
+
+
+async def aget_task_list_version(owner_id) -> int:
+    key = _version_key(owner_id)
+    version = await cache.aget(key)
+    if version is None:
+        version = time.time_ns()
+        await cache.aset(key, version, None)
+    return version
+
+
+def bump_task_list_version(owner_id) -> None:
+    """Invalidate every cached fragment for `owner_id` once the current transaction commits.
+
+    Bumping on commit (not immediately) stops a concurrent reader from caching
+    pre-commit rows under the new version.
+    """
+    if owner_id is None:
+        return
+
+    def bump():
+        try:
+            cache.incr(_version_key(owner_id))
+        except ValueError:
+            cache.set(_version_key(owner_id), time.time_ns(), None)
+
+    transaction.on_commit(bump)
+
+
+def _fragment_key(owner_id, version, cursor, csrf_secret) -> str:
+    page = hashlib.md5(f"{cursor or ''}:{csrf_secret}".encode()).hexdigest()
+    return f"tasks:list:{owner_id}:{version}:{page}"
+
+
+def task_list_fragment_key(owner_id, cursor, csrf_secret) -> str:
+    """Cache key for one rendered page of the task list.
+
+    The fragment embeds CSRF tokens, so the key includes a digest of the
+    user's CSRF secret; a rotated secret (e.g. after login) misses the cache.
+    """
+    return _fragment_key(owner_id, get_task_list_version(owner_id), cursor, csrf_secret)
+
+
+async def atask_list_fragment_key(owner_id, cursor, csrf_secret) -> str:
+    return _fragment_key(owner_id, await aget_task_list_version(owner_id), cursor, csrf_secret)
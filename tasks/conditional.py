@@ -0,0 +1,166 @@
+import hashlib
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.messages import get_messages
+from django.db.models import Count, Max, Q
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from accounts.cache import get_profile
+
+from .models import Task
+
+# Attribute used to memoize the validator on the request, since Django's
+# `condition` decorator asks for the ETag and Last-Modified separately.
+_REQUEST_ATTR = "_task_state"
+
+
+_STATE_AGGREGATES = {
+    "count": Count("pk", filter=Q(deleted_at__isnull=True)),
+    "last_modified": Max("updated_at"),
+}
+
+
+def task_state(owner):
+    """(count, MAX(updated_at)) for `owner`: one aggregate on the (owner, updated_at) index.
+
+    Tombstones count towards MAX(updated_at) (soft delete stamps it), so a
+    delete always moves Last-Modified forward; only live tasks are counted.
+    """
+    state = Task.all_objects.filter(owner=owner).aggregate(**_STATE_AGGREGATES)
+    return state["count"], state["last_modified"]
+
+
+async def atask_state(owner):
+    state = await Task.all_objects.filter(owner=owner).aaggregate(**_STATE_AGGREGATES)
+    return state["count"], state["last_modified"]
+
+
+def _request_state(request):
+    state = getattr(request, _REQUEST_ATTR, None)
+    if state is None:
+        state = task_state(request.user)
+        setattr(request, _REQUEST_ATTR, state)
+    return state
+
+
+async def _arequest_state(request, user):
+    state = getattr(request, _REQUEST_ATTR, None)
+    if state is None:
+        state = await atask_state(user)
+        setattr(request, _REQUEST_ATTR, state)
+    return state
+
+
+def make_etag(owner, state, *parts) -> str:
+    count, last_modified = state
+    raw = ":".join(str(p) for p in (owner.pk, count, last_modified.isoformat() if last_modified else "", *parts))
+    return '"%s"' % hashlib.md5(raw.encode()).hexdigest()
+
+
+def _latest(*stamps):
+    return max((stamp for stamp in stamps if stamp), default=None)
+
+
+def _has_messages(request) -> bool:
+    # The page shows one-shot flash messages; never let a 304 swallow them.
+    return bool(len(get_messages(request)))
+
+
+def _html_cacheable(request) -> bool:
+    return request.user.is_authenticated and not _has_messages(request)
+
+
+def task_list_etag(request, *args, **kwargs):
+    """ETag for the HTML task list. The page embeds CSRF tokens and shows the
+    profile in its header, so it also varies on the CSRF secret and on when
+    the profile last changed."""
+    if not _html_cacheable(request):
+        return None
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    profile = get_profile(request.user)
+    return make_etag(
+        request.user, _request_state(request), request.GET.urlencode(), csrf_secret, profile.updated_at.isoformat()
+    )
+
+
+def task_list_last_modified(request, *args, **kwargs):
+    if not _html_cacheable(request):
+        return None
+    return _latest(_request_state(request)[1], get_profile(request.user).updated_at)
+
+
+def task_json_etag(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    return make_etag(request.user, _request_state(request), "json", request.GET.urlencode())
+
+
+def task_json_last_modified(request, *args, **kwargs):
+    if not request.user.is_authenticated:
+        return None
+    return _request_state(request)[1]
+
+
+def add_validators(response, owner):
+    """Attach the owner's current JSON ETag/Last-Modified to a mutation response,
+    so clients can poll with If-None-Match without an extra round trip."""
+    state = task_state(owner)
+    response.headers["ETag"] = make_etag(owner, state, "json", "")
+    if state[1]:
+        response.headers["Last-Modified"] = http_date(state[1].timestamp())
+    return response
+
+
+async def aadd_validators(response, owner):
+    state = await atask_state(owner)
+    response.headers["ETag"] = make_etag(owner, state, "json", "")
+    if state[1]:
+        response.headers["Last-Modified"] = http_date(state[1].timestamp())
+    return response
+
+
+# Async views. Django's `condition` decorator calls its validators
+# synchronously, where the ORM is off limits, so these are awaited instead.
+
+async def atask_list_validators(request, user):
+    """(etag, last_modified) for the HTML task list; see task_list_etag."""
+    if _has_messages(request):
+        return None, None
+    state = await _arequest_state(request, user)
+    csrf_secret = request.META.get("CSRF_COOKIE", "")
+    profile = await sync_to_async(get_profile)(user)
+    etag = make_etag(user, state, request.GET.urlencode(), csrf_secret, profile.updated_at.isoformat())
+    return etag, _latest(state[1], profile.updated_at)
+
+
+async def atask_json_validators(request, user):
+    state = await _arequest_state(request, user)
+    return make_etag(user, state, "json", request.GET.urlencode()), state[1]
+
+
+def acondition(validators):
+    """Async counterpart of django.views.decorators.http.condition.
+
+    `validators(request, user)` is awaited for (etag, last_modified); the view
+    must already require login.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def inner(request, *args, **kwargs):
+            etag, last_modified = await validators(request, await request.auser())
+            timestamp = int(last_modified.timestamp()) if last_modified else None
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            if request.method in ("GET", "HEAD"):
+                if timestamp and not response.has_header("Last-Modified"):
+                    response.headers["Last-Modified"] = http_date(timestamp)
+                if etag:
+                    response.headers.setdefault("ETag", etag)
+            return response
+
+        return inner
+
+    return decorator
@@ -0,0 +1,138 @@
+"""In-process, per-owner feed of task changes for the live task list.
+
+Every Task save and delete (and the queryset updates that bypass signals)
+ends up in notify_task_changed(). Once the transaction commits, the changed
+rows are rendered and pushed to the owner's open event streams
+(tasks.async_views.task_events).
+
+Subscribers are asyncio queues living on the ASGI server's event loop, so an
+idle stream costs one queue and one suspended coroutine (when served by
+tasks.asgi.TaskEventsApp; see there). Publishing happens
+in whatever thread made the change and hands events over with
+call_soon_threadsafe. Streams only see changes made in their own process.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import defaultdict
+
+from django.db import transaction
+from django.template.loader import render_to_string
+
+# Events a stream may have queued before it is considered stalled. A stalled
+# stream is told to reload instead of buffering without bound.
+MAX_PENDING_EVENTS = 100
+
+# Seconds between keep-alive comments on an idle stream, so proxies don't
+# time it out.
+KEEPALIVE_INTERVAL = 15
+
+_subscribers = defaultdict(set)
+_lock = threading.Lock()
+_event_ids = itertools.count(1)
+
+
+class Subscription:
+    def __init__(self, owner_id):
+        self.owner_id = owner_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=MAX_PENDING_EVENTS)
+
+    def offer(self, event):
+        # Runs on the subscriber's loop.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(_event("refresh", {}))
+
+
+def subscribe(owner_id) -> Subscription:
+    subscription = Subscription(owner_id)
+    with _lock:
+        _subscribers[owner_id].add(subscription)
+    return subscription
+
+
+def unsubscribe(subscription) -> None:
+    with _lock:
+        subscribers = _subscribers.get(subscription.owner_id)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del _subscribers[subscription.owner_id]
+
+
+def has_subscribers(owner_id) -> bool:
+    return owner_id in _subscribers
+
+
+def _event(kind, data):
+    return {"id": next(_event_ids), "event": kind, "data": json.dumps(data)}
+
+
+def publish(owner_id, kind, data) -> None:
+    event = _event(kind, data)
+    with _lock:
+        subscribers = list(_subscribers.get(owner_id, ()))
+    for subscription in subscribers:
+        try:
+            subscription.loop.call_soon_threadsafe(subscription.offer, event)
+        except RuntimeError:
+            # The loop has shut down; the stream is gone with it.
+            unsubscribe(subscription)
+
+
+def notify_task_changed(owner_id, pks, kind="update") -> None:
+    """Push `owner_id`'s tasks `pks` to their streams once the transaction commits.
+
+    `kind` is "create" or "update" for live rows; rows that are gone or
+    soft-deleted are always sent as "delete". Free when nobody is listening.
+    """
+    pks = list(pks)
+    if owner_id is None or not pks or not has_subscribers(owner_id):
+        return
+    transaction.on_commit(lambda: _publish_rows(owner_id, pks, kind))
+
+
+def notify_refresh(owner_id) -> None:
+    """Ask `owner_id`'s streams to reload, for changes too broad to send row by row."""
+    if owner_id is not None and has_subscribers(owner_id):
+        transaction.on_commit(lambda: publish(owner_id, "refresh", {}))
+
+
+def _publish_rows(owner_id, pks, kind):
+    from .models import Task
+
+    rows = Task.all_objects.filter(owner_id=owner_id, pk__in=pks).in_bulk()
+    for pk in pks:
+        task = rows.get(pk)
+        if task is None or task.deleted_at is not None:
+            publish(owner_id, "delete", {"id": pk})
+        else:
+            # No request here: the client adds its own CSRF token to the form.
+            # "NOTPROVIDED" makes {% csrf_token %} render nothing, without a warning.
+            html = render_to_string("tasks/includes/task_item.html", {"task": task, "csrf_token": "NOTPROVIDED"})
+            publish(owner_id, kind, {"id": pk, "html": html})
+
+
+async def event_stream(owner_id):
+    """Server-Sent Events text for `owner_id`'s changes, until the consumer stops.
+
+    Subscribes on the first chunk, so a stream that never starts leaves
+    nothing behind.
+    """
+    subscription = subscribe(owner_id)
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), KEEPALIVE_INTERVAL)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield f"id: {event['id']}\nevent: {event['event']}\ndata: {event['data']}\n\n"
+    finally:
+        unsubscribe(subscription)
@@ -24,3 +24,11 @@ class TaskForm(forms.ModelForm):
         if due and due < timezone.now():
             raise forms.ValidationError('Due date cannot be in the past.')
         return due
+
+
+class TaskImportForm(TaskForm):
+    """TaskForm's rules for imported rows, but due dates may be in the past:
+    an overdue task that was exported must import as it was."""
+
+    def clean_due_date(self):
+        return self.cleaned_data.get('due_date')
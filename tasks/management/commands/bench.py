@@ -0,0 +1,262 @@
+import json
+import math
+import platform
+import random
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from io import StringIO
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import Group
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.models import Profile
+from accounts.views import ADMIN_GROUP_NAME, USER_GROUP_NAME
+from tasks.management.commands.bench_asgi import BENCH_CACHES, STORAGES
+from tasks.models import Task
+
+User = get_user_model()
+
+# (weight, (min, max) offset from now in hours) of a task's due date; None
+# means no due date. Most open work is due within the next two weeks, some
+# of it is already overdue.
+DUE_DATES = (
+    (20, None),
+    (15, (-14 * 24, 0)),
+    (25, (0, 48)),
+    (30, (48, 14 * 24)),
+    (10, (14 * 24, 90 * 24)),
+)
+PRIORITIES = ((20, 'high'), (50, 'medium'), (30, 'low'))
+COMPLETED_RATE = 0.35
+
+TITLE_WORDS = (
+    'review', 'write', 'call', 'email', 'fix', 'plan', 'buy', 'book', 'draft', 'update',
+    'report', 'invoice', 'groceries', 'meeting', 'dentist', 'slides', 'budget', 'release', 'notes', 'tickets',
+)
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of the sorted list `values`."""
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+def _git_revision():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark the task list, dashboard, task actions and send_reminders on a seeded throwaway '
+        'test database; prints JSON so runs can be compared across commits'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100, help='Number of synthetic users')
+        parser.add_argument('--tasks', type=int, default=100, help='Tasks per user')
+        parser.add_argument('--repeat', type=int, default=30, help='Timed runs per scenario')
+        parser.add_argument('--warmup', type=int, default=3, help='Untimed runs before each scenario')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the dataset and the picks')
+        parser.add_argument('--output', help='Write the JSON report to this file instead of stdout')
+
+    def handle(self, *args, **options):
+        if options['users'] < 1 or options['tasks'] < 1 or options['repeat'] < 1:
+            raise CommandError('--users, --tasks and --repeat must be at least 1.')
+
+        # Never touch the real database: build and drop a test database around the run.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            # Pages render {% static %}; the test client needs its host allowed. The
+            # seeded users reuse real users' pks, so they get a cache of their own.
+            with override_settings(
+                DEBUG=False, STORAGES=STORAGES, ALLOWED_HOSTS=['testserver'], CACHES=BENCH_CACHES
+            ):
+                cache.clear()
+                try:
+                    seeded = self._seed(options['users'], options['tasks'], options['seed'])
+                    results = self._run(options['repeat'], options['warmup'], options['seed'])
+                finally:
+                    cache.clear()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'git_revision': _git_revision(),
+                'created_at': timezone.now().isoformat(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'sqlite_profile': getattr(settings, 'SQLITE_PROFILE', None),
+                'async_views': getattr(settings, 'TASKS_ASYNC_VIEWS', False),
+                'users': options['users'],
+                'tasks_per_user': options['tasks'],
+                'repeat': options['repeat'],
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                **seeded,
+            },
+            'results': results,
+        }
+        text = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(text + '\n')
+            for name, result in results.items():
+                self.stderr.write(
+                    f"{name:<26} p50={result['p50_ms']:8.2f}ms  p95={result['p95_ms']:8.2f}ms  "
+                    f"p99={result['p99_ms']:8.2f}ms  queries={result['queries']['median']:g}"
+                )
+            self.stderr.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+        else:
+            self.stdout.write(text)
+
+    def _seed(self, n_users, n_tasks, seed):
+        rng = random.Random(seed)
+        now = timezone.now()
+        password = make_password(None)
+        started = time.perf_counter()
+
+        admin_group, user_group = (Group.objects.create(name=n) for n in (ADMIN_GROUP_NAME, USER_GROUP_NAME))
+        admin = User.objects.create(username='bench-admin', email='bench-admin@example.com', password=password)
+        admin.groups.add(admin_group)
+
+        users = User.objects.bulk_create(
+            User(
+                username=f'bench{i}',
+                email=f'bench{i}@example.com' if rng.random() < 0.9 else '',
+                password=password,
+                is_active=rng.random() < 0.95,
+            )
+            for i in range(n_users)
+        )
+        # bulk_create skips the signals that normally add these.
+        Profile.objects.bulk_create(Profile(user=user) for user in users)
+        User.groups.through.objects.bulk_create(
+            User.groups.through(user_id=user.pk, group_id=user_group.pk) for user in users
+        )
+
+        due_weights, due_ranges = zip(*DUE_DATES)
+        priority_weights, priorities = zip(*PRIORITIES)
+        batch = []
+        for user in users:
+            for _ in range(n_tasks):
+                hours = rng.choices(due_ranges, due_weights)[0]
+                due = None if hours is None else now + timedelta(minutes=rng.randint(hours[0] * 60, hours[1] * 60))
+                batch.append(Task(
+                    owner_id=user.pk,
+                    title=' '.join(rng.sample(TITLE_WORDS, rng.randint(2, 5))).capitalize(),
+                    completed=rng.random() < COMPLETED_RATE,
+                    due_date=due,
+                    priority=rng.choices(priorities, priority_weights)[0],
+                ))
+                if len(batch) >= 10_000:
+                    Task.objects.bulk_create(batch)
+                    batch = []
+        Task.objects.bulk_create(batch)
+        return {'seed_seconds': round(time.perf_counter() - started, 3)}
+
+    def _run(self, repeat, warmup, seed):
+        rng = random.Random(seed)
+        admin = User.objects.get(username='bench-admin')
+        members = list(User.objects.filter(username__startswith='bench', is_active=True).exclude(pk=admin.pk)[:10])
+        clients = []
+        for member in members:
+            client = Client()
+            client.force_login(member)
+            clients.append((client, list(Task.objects.filter(owner=member).values_list('pk', flat=True))))
+        if not clients or sum(len(pks) for _, pks in clients) < warmup + repeat:
+            raise CommandError('Not enough active users and tasks to run every scenario; raise --users or --tasks.')
+        admin_client = Client()
+        admin_client.force_login(admin)
+        term = members[0].username[:6]
+
+        def pick():
+            client, pks = rng.choice(clients)
+            return client, rng.choice(pks)
+
+        def task_list():
+            return rng.choice(clients)[0].get(reverse('tasks:task_list')), 200
+
+        def prime_task_lists():
+            for client, _ in clients:
+                client.get(reverse('tasks:task_list'))
+
+        def toggle():
+            client, pk = pick()
+            return client.post(reverse('tasks:toggle_task', args=[pk])), 302
+
+        deleted = []
+
+        def delete():
+            client, pk = pick()
+            while (client, pk) in deleted:
+                client, pk = pick()
+            deleted.append((client, pk))
+            return client.post(reverse('tasks:delete_task_ajax', args=[pk])), 200
+
+        def undo():
+            client, pk = deleted.pop(0)
+            return client.post(reverse('tasks:undo_delete', args=[pk])), 200
+
+        def reminders():
+            call_command('send_reminders', dry_run=True, stdout=StringIO())
+            return None, None
+
+        # (name, run, before the scenario, before each run)
+        scenarios = (
+            # Each run starts from an empty cache, like the first view after a change.
+            ('task_list', task_list, None, cache.clear),
+            ('task_list_cached', task_list, prime_task_lists, None),
+            ('dashboard', lambda: (admin_client.get(reverse('accounts:dashboard')), 200), None, None),
+            ('dashboard_q', lambda: (admin_client.get(reverse('accounts:dashboard'), {'q': term}), 200), None, None),
+            ('toggle_task', toggle, None, None),
+            ('delete_task_ajax', delete, None, None),
+            # Restores the tasks deleted above, in the same order.
+            ('undo_delete', undo, None, None),
+            ('send_reminders_dry_run', reminders, None, None),
+        )
+        results = {}
+        for name, run, prepare, setup in scenarios:
+            if prepare is not None:
+                prepare()
+            timings, queries = [], []
+            for i in range(warmup + repeat):
+                if setup is not None:
+                    setup()
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response, expected = run()
+                    elapsed = (time.perf_counter() - started) * 1000
+                if response is not None and response.status_code != expected:
+                    raise CommandError(f'{name}: expected HTTP {expected}, got {response.status_code}')
+                if i >= warmup:
+                    timings.append(elapsed)
+                    queries.append(len(captured))
+            timings.sort()
+            results[name] = {
+                'runs': repeat,
+                'p50_ms': round(_percentile(timings, 50), 3),
+                'p95_ms': round(_percentile(timings, 95), 3),
+                'p99_ms': round(_percentile(timings, 99), 3),
+                'mean_ms': round(statistics.fmean(timings), 3),
+                'queries': {'min': min(queries), 'median': statistics.median(queries), 'max': max(queries)},
+            }
+        return results
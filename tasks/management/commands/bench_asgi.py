@@ -0,0 +1,182 @@
+import asyncio
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+from importlib import import_module
+from types import ModuleType, SimpleNamespace
+
+from django.conf import settings
+from django.contrib.auth import BACKEND_SESSION_KEY, HASH_SESSION_KEY, SESSION_KEY, get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import override_settings
+from django.urls import include, path
+from django.utils.crypto import get_random_string
+
+from tasks import async_views, views
+from tasks.models import Task
+from tasks.urls import task_urlpatterns
+
+User = get_user_model()
+
+# (weight, kind) of each simulated action; 'delete' is a delete + undo pair.
+MIX = ((30, 'list'), (30, 'json'), (25, 'toggle'), (15, 'delete'))
+
+# Pages render {% static %} with DEBUG off; don't require a collectstatic manifest.
+STORAGES = {**settings.STORAGES, 'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}}
+
+# A private in-process cache: the seeded users reuse real users' pks, so in
+# the configured cache their keys would collide with real entries.
+BENCH_CACHES = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'bench'}}
+
+
+def _urlconf(task_views):
+    """The project URLconf with the task routes served by `task_views`."""
+    root = import_module(settings.ROOT_URLCONF)
+    patterns = [p for p in root.urlpatterns if getattr(p, 'namespace', None) != 'tasks']
+    patterns.append(path('tasks/', include((task_urlpatterns(task_views), 'tasks'), namespace='tasks')))
+    urlconf = ModuleType(f'{task_views.__name__}_urls')
+    urlconf.urlpatterns = patterns
+    return urlconf
+
+
+async def _call(app, method, url, headers):
+    """Send one request through the ASGI application; return the status code."""
+    path_info, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': method, 'scheme': 'http', 'path': path_info, 'raw_path': path_info.encode(),
+        'query_string': query.encode(), 'root_path': '', 'headers': headers,
+        'client': ('127.0.0.1', 0), 'server': ('localhost', 80),
+    }
+    finished = asyncio.Event()
+    request_sent = False
+    status = None
+
+    async def receive():
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        # Django listens for a disconnect while the view runs; never send one early.
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal status
+        if message['type'] == 'http.response.start':
+            status = message['status']
+        elif message['type'] == 'http.response.body' and not message.get('more_body'):
+            finished.set()
+
+    await app(scope, receive, send)
+    finished.set()
+    return status
+
+
+class Command(BaseCommand):
+    help = 'Load-test the task views through the ASGI handler: sync views vs tasks.async_views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Concurrent simulated users')
+        parser.add_argument('--tasks', type=int, default=200, help='Tasks per user')
+        parser.add_argument('--actions', type=int, default=100, help='Actions per user and mode')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for data and action mix')
+
+    def handle(self, *args, **options):
+        # A throwaway file database, so concurrent requests see real SQLite locking.
+        tmp = tempfile.mkdtemp()
+        connection.settings_dict['TEST']['NAME'] = os.path.join(tmp, 'bench_asgi.sqlite3')
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        with override_settings(CACHES=BENCH_CACHES):
+            try:
+                clients = self._seed(options['users'], options['tasks'], options['seed'])
+                connection.close()
+                app = ASGIHandler()
+                results = {}
+                for mode, task_views in (('sync', views), ('async', async_views)):
+                    with override_settings(ROOT_URLCONF=_urlconf(task_views), DEBUG=False, STORAGES=STORAGES):
+                        # Warm caches and imports, then measure.
+                        asyncio.run(self._load(app, clients, max(1, options['actions'] // 10), options['seed']))
+                        results[mode] = asyncio.run(self._load(app, clients, options['actions'], options['seed']))
+                    connection.close()
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                # WAL mode leaves -wal/-shm files next to the database.
+                shutil.rmtree(tmp, ignore_errors=True)
+
+        for mode, (elapsed, latencies, errors) in results.items():
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"{mode:<6} {len(latencies):>6} requests  {len(latencies) / elapsed:8.1f} req/s  "
+                f"p50={statistics.median(latencies):7.2f}ms  p99={p99:7.2f}ms  errors={errors}"
+            )
+        sync_rps = len(results['sync'][1]) / results['sync'][0]
+        async_rps = len(results['async'][1]) / results['async'][0]
+        self.stdout.write(self.style.SUCCESS(f"Throughput, async vs sync views: {async_rps / sync_rps:.2f}x"))
+
+    def _seed(self, n_users, n_tasks, seed):
+        rng = random.Random(seed)
+        password = make_password(None)
+        users = User.objects.bulk_create(
+            User(username=f'bench{i}', email=f'bench{i}@example.com', password=password) for i in range(n_users)
+        )
+        Task.objects.bulk_create(
+            (
+                Task(owner=user, title=f'task {i}', priority=rng.choice(('high', 'medium', 'low')),
+                     completed=rng.random() < 0.3)
+                for user in users for i in range(n_tasks)
+            ),
+            batch_size=1000,
+        )
+
+        store = import_module(settings.SESSION_ENGINE).SessionStore
+        backend = settings.AUTHENTICATION_BACKENDS[0]
+        clients = []
+        for user in User.objects.filter(username__startswith='bench'):
+            session = store()
+            session[SESSION_KEY] = str(user.pk)
+            session[BACKEND_SESSION_KEY] = backend
+            session[HASH_SESSION_KEY] = user.get_session_auth_hash()
+            session.create()
+            csrf = get_random_string(32)
+            cookie = f'{settings.SESSION_COOKIE_NAME}={session.session_key}; {settings.CSRF_COOKIE_NAME}={csrf}'
+            clients.append(SimpleNamespace(
+                task_ids=list(Task.objects.filter(owner=user).values_list('pk', flat=True)),
+                headers=[(b'host', b'localhost'), (b'cookie', cookie.encode()), (b'x-csrftoken', csrf.encode())],
+            ))
+        return clients
+
+    async def _load(self, app, clients, actions, seed):
+        latencies = []
+        errors = 0
+        weights, kinds = zip(*MIX)
+
+        async def user(client, rng):
+            nonlocal errors
+            for kind in rng.choices(kinds, weights, k=actions):
+                pk = rng.choice(client.task_ids)
+                if kind == 'list':
+                    requests = [('GET', '/tasks/')]
+                elif kind == 'json':
+                    requests = [('GET', '/tasks/api/tasks/')]
+                elif kind == 'toggle':
+                    requests = [('POST', f'/tasks/toggle_ajax/{pk}/')]
+                else:
+                    requests = [('POST', f'/tasks/delete_ajax/{pk}/'), ('POST', f'/tasks/undo_delete/{pk}/')]
+                for method, url in requests:
+                    started = time.perf_counter()
+                    status = await _call(app, method, url, client.headers)
+                    latencies.append((time.perf_counter() - started) * 1000)
+                    if status is None or status >= 400:
+                        errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user(c, random.Random(seed + i)) for i, c in enumerate(clients)))
+        return time.perf_counter() - started, latencies, errors
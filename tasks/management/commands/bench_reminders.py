@@ -0,0 +1,134 @@
+import random
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from tasks.management.commands.send_reminders import Command as SendRemindersCommand
+from tasks.models import Task
+
+User = get_user_model()
+
+REMINDER_INDEX = 'tasks_task_reminder_due_idx'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the send_reminders query before/after SQL de-duplication on a throwaway test database'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Number of synthetic users')
+        parser.add_argument('--tasks', type=int, default=1_000_000, help='Number of synthetic tasks')
+        parser.add_argument('--hours', type=int, default=24, help='Look ahead window in hours')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the generated dataset')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stderr.write('bench_reminders measures SQLite VM steps and only runs on SQLite.')
+            return
+
+        # Never touch the real database: build and drop a test database around the run.
+        old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+        try:
+            self._seed(options['users'], options['tasks'], options['hours'], options['seed'])
+            self._compare(options['hours'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+    def _seed(self, n_users, n_tasks, hours, seed):
+        rng = random.Random(seed)
+        now = timezone.now()
+        password = make_password(None)
+        started = time.perf_counter()
+
+        users = User.objects.bulk_create(
+            User(username=f'bench{i}', email=f'bench{i}@example.com' if rng.random() < 0.9 else '', password=password)
+            for i in range(n_users)
+        )
+        owner_ids = [u.pk for u in users]
+
+        batch = []
+        for _ in range(n_tasks):
+            due = None if rng.random() < 0.15 else now + timedelta(minutes=rng.randint(-60 * 24 * 60, 60 * 24 * 60))
+            reminded = None
+            if due and now <= due <= now + timedelta(hours=hours) and rng.random() < 0.6:
+                reminded = now - timedelta(minutes=rng.randint(1, hours * 60 - 1))
+            batch.append(Task(
+                owner_id=rng.choice(owner_ids),
+                title='bench task',
+                completed=rng.random() < 0.4,
+                due_date=due,
+                priority=rng.choice(('high', 'medium', 'low')),
+                last_reminder_sent=reminded,
+            ))
+            if len(batch) >= 10_000:
+                Task.objects.bulk_create(batch)
+                batch = []
+        Task.objects.bulk_create(batch)
+        self.stdout.write(f"Seeded {n_users} users / {n_tasks} tasks in {time.perf_counter() - started:.1f}s")
+
+    def _compare(self, hours):
+        now = timezone.now()
+        window = now + timedelta(hours=hours)
+        base = Task.objects.filter(completed=False, due_date__isnull=False, due_date__lte=window, due_date__gte=now)
+        index = next(i for i in Task._meta.indexes if i.name == REMINDER_INDEX)
+
+        before_qs = base.select_related('owner')
+        after_qs = SendRemindersCommand()._pending_reminders(base, now, hours).select_related('owner').order_by('due_date')
+
+        def before():
+            # Previous behaviour: fetch every window row, de-duplicate in Python.
+            returned = kept = 0
+            for task in before_qs:
+                returned += 1
+                owner = task.owner
+                if not owner or not owner.email:
+                    continue
+                if task.last_reminder_sent and (now - task.last_reminder_sent).total_seconds() < (hours * 3600):
+                    continue
+                kept += 1
+            return returned, kept
+
+        def after():
+            kept = sum(1 for _ in after_qs)
+            return kept, kept
+
+        with connection.schema_editor() as editor:
+            editor.remove_index(Task, index)
+        self._report('before (no partial index, Python de-dup)', before, before_qs)
+
+        with connection.schema_editor() as editor:
+            editor.add_index(Task, index)
+        self._report('after (partial index, SQL de-dup)', after, after_qs)
+
+    def _report(self, label, run, queryset):
+        steps = [0]
+
+        def tick():
+            steps[0] += 1
+            return 0
+
+        # SQLite has no "rows examined" counter. The query plan shows whether
+        # it seeks an index (SEARCH) or walks the whole table (SCAN), and the
+        # VM instructions executed (counted in steps of 100 by the progress
+        # handler) grow with every row it touches, returned or not.
+        plan = [line.split(' ', 3)[-1] for line in queryset.explain().splitlines()]
+        connection.ensure_connection()
+        raw = connection.connection
+        raw.set_progress_handler(tick, 100)
+        started = time.perf_counter()
+        try:
+            returned, kept = run()
+        finally:
+            raw.set_progress_handler(None, 0)
+        elapsed = (time.perf_counter() - started) * 1000
+
+        self.stdout.write(
+            f"{label:<45} vm_steps~{steps[0] * 100:>12}  rows returned={returned:>8}  "
+            f"reminders={kept:>8}  time={elapsed:8.1f}ms"
+        )
+        for line in plan:
+            self.stdout.write(f"    {line}")
@@ -0,0 +1,130 @@
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand
+
+from todo.sqlite import PROFILES, apply_pragmas
+
+SCHEMA = (
+    "CREATE TABLE bench_task (id INTEGER PRIMARY KEY, owner_id INTEGER NOT NULL, "
+    "title TEXT NOT NULL, completed INTEGER NOT NULL DEFAULT 0, updated_at REAL NOT NULL)",
+    "CREATE INDEX bench_task_owner ON bench_task (owner_id, id)",
+)
+
+
+def _connect(path, profile):
+    # Same connection setup as Django's SQLite backend: autocommit at the
+    # driver level, with the 5s default busy handler of the sqlite3 module.
+    conn = sqlite3.connect(path, isolation_level=None)
+    apply_pragmas(conn.cursor(), PROFILES[profile])
+    return conn
+
+
+def _worker(path, profile, role, seconds, owners, seed):
+    """Run one simulated worker process for `seconds`; return its counters."""
+    rng = random.Random(seed)
+    conn = _connect(path, profile)
+    # The production profile also switches Django to BEGIN IMMEDIATE.
+    begin = "BEGIN IMMEDIATE" if profile == "production" else "BEGIN"
+    ops, errors, latencies = 0, 0, []
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        owner = rng.randint(1, owners)
+        started = time.perf_counter()
+        try:
+            if role == "write":
+                # Shaped like an ORM request: read first, then write, in one transaction.
+                conn.execute(begin)
+                conn.execute("SELECT COUNT(*) FROM bench_task WHERE owner_id = ?", [owner]).fetchone()
+                conn.execute(
+                    "INSERT INTO bench_task (owner_id, title, updated_at) VALUES (?, ?, ?)",
+                    [owner, f"task {rng.random()}", time.time()],
+                )
+                conn.execute(
+                    "UPDATE bench_task SET completed = 1 - completed, updated_at = ? "
+                    "WHERE id = (SELECT id FROM bench_task WHERE owner_id = ? ORDER BY id DESC LIMIT 1)",
+                    [time.time(), owner],
+                )
+                conn.execute("COMMIT")
+            else:
+                conn.execute(
+                    "SELECT id, title, completed FROM bench_task WHERE owner_id = ? ORDER BY id LIMIT 50", [owner]
+                ).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            continue
+        ops += 1
+        latencies.append((time.perf_counter() - started) * 1000)
+    conn.close()
+    return role, ops, errors, latencies
+
+
+class Command(BaseCommand):
+    help = 'Benchmark concurrent SQLite writes and reads under each profile in todo/sqlite.py'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--writers', type=int, default=4, help='Writer processes')
+        parser.add_argument('--readers', type=int, default=4, help='Reader processes')
+        parser.add_argument('--seconds', type=float, default=5.0, help='Duration of each run')
+        parser.add_argument('--owners', type=int, default=100, help='Distinct task owners')
+        parser.add_argument('--rows', type=int, default=50_000, help='Rows seeded before each run')
+        parser.add_argument('--profile', action='append', choices=list(PROFILES), help='Profile(s) to run (default: all)')
+
+    def handle(self, *args, **options):
+        # A real file per run: WAL and locking behaviour do not apply to :memory:.
+        results = {}
+        for profile in options['profile'] or list(PROFILES):
+            with tempfile.TemporaryDirectory() as tmp:
+                path = os.path.join(tmp, 'bench.sqlite3')
+                self._seed(path, options['rows'], options['owners'])
+                results[profile] = self._run(path, profile, options)
+
+        if 'default' in results and 'production' in results and results['default']:
+            gain = results['production'] / results['default']
+            self.stdout.write(self.style.SUCCESS(f"Write throughput, production vs default: {gain:.2f}x"))
+
+    def _seed(self, path, rows, owners):
+        conn = sqlite3.connect(path, isolation_level=None)
+        for statement in SCHEMA:
+            conn.execute(statement)
+        conn.execute("BEGIN")
+        now = time.time()
+        conn.executemany(
+            "INSERT INTO bench_task (owner_id, title, updated_at) VALUES (?, ?, ?)",
+            ((i % owners + 1, f"seed {i}", now) for i in range(rows)),
+        )
+        conn.execute("COMMIT")
+        conn.close()
+
+    def _run(self, path, profile, options):
+        roles = ['write'] * options['writers'] + ['read'] * options['readers']
+        seconds = options['seconds']
+        with ProcessPoolExecutor(max_workers=len(roles)) as pool:
+            futures = [
+                pool.submit(_worker, path, profile, role, seconds, options['owners'], seed)
+                for seed, role in enumerate(roles)
+            ]
+            outcomes = [f.result() for f in futures]
+
+        throughput = {}
+        for role in ('write', 'read'):
+            ops = sum(o[1] for o in outcomes if o[0] == role)
+            errors = sum(o[2] for o in outcomes if o[0] == role)
+            latencies = sorted(l for o in outcomes if o[0] == role for l in o[3])
+            throughput[role] = ops / seconds
+            if not latencies:
+                self.stdout.write(f"{profile:<11} {role:<5} ops=0 locked={errors}")
+                continue
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"{profile:<11} {role:<5} {ops / seconds:9.1f} ops/s  locked={errors:<5} "
+                f"p50={statistics.median(latencies):7.2f}ms  p99={p99:7.2f}ms"
+            )
+        return throughput['write']
@@ -0,0 +1,61 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks.cache import bump_task_list_version
+from tasks.events import notify_refresh
+from tasks.transfer import FORMATS, IMPORT_BATCH_SIZE, TransferError, guess_format, import_tasks
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = 'Import tasks for a user from a CSV or NDJSON file (the format written by the task export)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('username', help='Owner of the imported tasks')
+        parser.add_argument('path', help='CSV or NDJSON file to import')
+        parser.add_argument('--format', choices=FORMATS, help='File format (default: from the file extension)')
+        parser.add_argument('--batch-size', type=int, default=IMPORT_BATCH_SIZE, help='Rows inserted per transaction')
+        parser.add_argument('--report', help='Write the per-row error report as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            owner = User.objects.get(username=options['username'])
+        except User.DoesNotExist:
+            raise CommandError(f"No user named {options['username']!r}.")
+
+        try:
+            fmt = guess_format(options['path'], options['format'])
+            with open(options['path'], 'rb') as f:
+                report = import_tasks(owner, f, fmt, batch_size=max(1, options['batch_size']))
+        except TransferError as e:
+            # The rows before the unreadable part are saved.
+            if e.report and e.report['created']:
+                self._refresh(owner)
+                raise CommandError(f"{e} ({e.report['created']} tasks were imported before it)")
+            raise CommandError(str(e))
+        except OSError as e:
+            raise CommandError(str(e))
+
+        if report['created']:
+            self._refresh(owner)
+
+        for error in report['errors']:
+            messages = '; '.join(f'{field}: {" ".join(msgs)}' for field, msgs in error['errors'].items())
+            self.stderr.write(f"line {error['line']}: {messages}")
+        if report['errors_truncated']:
+            self.stderr.write(f"... {report['failed'] - len(report['errors'])} more rows with errors")
+        if options['report']:
+            with open(options['report'], 'w') as f:
+                json.dump(report, f, indent=2)
+                f.write('\n')
+
+        style = self.style.SUCCESS if not report['failed'] else self.style.WARNING
+        self.stdout.write(style(f"{report['created']} tasks imported, {report['failed']} rows rejected."))
+
+    def _refresh(self, owner):
+        # bulk_create() bypasses the Task signals.
+        bump_task_list_version(owner.pk)
+        notify_refresh(owner.pk)
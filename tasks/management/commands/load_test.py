@@ -0,0 +1,290 @@
+import json
+import math
+import random
+import statistics
+import threading
+import time
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPCookieProcessor, HTTPRedirectHandler, Request, build_opener
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+from django.utils import timezone
+
+from accounts.views import USER_GROUP_NAME, ensure_group
+
+User = get_user_model()
+
+ACTIONS = ('list', 'create', 'toggle', 'delete', 'undo')
+DEFAULT_MIX = 'list=40,create=15,toggle=25,delete=10,undo=10'
+
+# What Django's 500 page (DEBUG on) shows when SQLite's busy timeout ran out.
+LOCK_MESSAGE = b'database is locked'
+
+
+def _parse_mix(value):
+    mix = {}
+    for part in value.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in ACTIONS:
+            raise CommandError(f'Unknown action {name!r} in --mix; expected one of {", ".join(ACTIONS)}.')
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise CommandError(f'Invalid weight {weight!r} for {name!r} in --mix.')
+    if not any(mix.values()):
+        raise CommandError('--mix needs at least one action with a positive weight.')
+    return mix
+
+
+def _percentile(values, pct):
+    """Nearest-rank percentile of the sorted list `values`."""
+    return values[max(0, math.ceil(pct / 100 * len(values)) - 1)]
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    # Report the redirect itself (the app answers form posts with 302).
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class Session:
+    """One simulated browser: its own cookies, CSRF token and task ids."""
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies), _NoRedirect)
+        self.task_ids = []
+        self.deleted = []
+
+    def cookie(self, name):
+        return next((c.value for c in self.cookies if c.name == name), '')
+
+    def request(self, method, path, data=None):
+        """Return (status, body); status is None when the server didn't answer."""
+        body = urlencode(data or {}).encode() if method == 'POST' else None
+        request = Request(self.base_url + path, data=body, method=method)
+        if method == 'POST':
+            request.add_header('Content-Type', 'application/x-www-form-urlencoded')
+            request.add_header('X-CSRFToken', self.cookie(settings.CSRF_COOKIE_NAME))
+            request.add_header('Referer', self.base_url + path)
+        try:
+            with self.opener.open(request, timeout=self.timeout) as response:
+                return response.status, response.read()
+        except HTTPError as e:
+            return e.code, e.read()
+        except (URLError, OSError):
+            return None, b''
+
+    def login(self, username, password):
+        login_url = reverse('accounts:login')
+        self.request('GET', login_url)
+        status, _ = self.request('POST', login_url, {
+            'username': username,
+            'password': password,
+            'csrfmiddlewaretoken': self.cookie(settings.CSRF_COOKIE_NAME),
+        })
+        if status != 302:
+            raise CommandError(f'Could not log in as {username!r} (HTTP {status}).')
+
+    def refresh_task_ids(self):
+        status, body = self.request('GET', reverse('tasks:task_list_json'))
+        if status == 200:
+            self.task_ids = [task['id'] for task in json.loads(body)['tasks']]
+
+
+class Command(BaseCommand):
+    help = (
+        'Drive a running server (e.g. `manage.py runserver` or uvicorn) with concurrent logged-in users '
+        'and report throughput, error and lock-timeout rates and latency'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', default='http://127.0.0.1:8000', help='Base URL of the running server')
+        parser.add_argument(
+            '--users', default='10',
+            help='Concurrent users; a comma-separated list (e.g. 5,10,25,50) runs one stage per value',
+        )
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per stage')
+        parser.add_argument('--mix', default=DEFAULT_MIX, help=f'Action weights (default: {DEFAULT_MIX})')
+        parser.add_argument('--think-time', type=float, default=0, help='Pause between actions of a user, in ms')
+        parser.add_argument('--timeout', type=float, default=30, help='Client timeout per request, in seconds')
+        parser.add_argument('--prefix', default='loadtest', help='Username prefix of the simulated users')
+        parser.add_argument('--password', default='loadtest-password', help='Password of the simulated users')
+        parser.add_argument(
+            '--create-users', action='store_true',
+            help='Create missing simulated users (and reset their password) in the configured database first',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Random seed for the action mix')
+        parser.add_argument('--output', help='Also write the report as JSON to this file')
+
+    def handle(self, *args, **options):
+        try:
+            stages = [int(n) for n in options['users'].split(',')]
+        except ValueError:
+            raise CommandError('--users must be a number or a comma-separated list of numbers.')
+        if min(stages) < 1:
+            raise CommandError('--users values must be at least 1.')
+        mix = _parse_mix(options['mix'])
+        usernames = [f"{options['prefix']}{i}" for i in range(max(stages))]
+
+        if options['create_users']:
+            self._create_users(usernames, options['password'])
+
+        probe = Session(options['url'], options['timeout'])
+        if probe.request('GET', reverse('accounts:login'))[0] is None:
+            raise CommandError(f"No server answering at {options['url']}.")
+
+        # Log everyone in up front, so stages measure the task routes only.
+        sessions = []
+        for username in usernames:
+            session = Session(options['url'], options['timeout'])
+            session.login(username, options['password'])
+            session.refresh_task_ids()
+            sessions.append(session)
+
+        report = []
+        for n_users in stages:
+            stage = self._run_stage(sessions[:n_users], mix, options)
+            report.append(stage)
+            self._print_stage(stage)
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({'url': options['url'], 'mix': mix, 'stages': report}, f, indent=2)
+                f.write('\n')
+            self.stdout.write(self.style.SUCCESS(f"Wrote {options['output']}"))
+
+    def _create_users(self, usernames, password):
+        existing = set(User.objects.filter(username__in=usernames).values_list('username', flat=True))
+        hashed = make_password(password)
+        # One hash for everyone; create_user() would hash once per user.
+        User.objects.filter(username__in=existing).update(password=hashed)
+        # Regular saves, so the usual signals add profiles.
+        for username in usernames:
+            if username not in existing:
+                User.objects.create(username=username, email=f'{username}@example.com', password=hashed)
+        # In the "user" group, like a public sign-up (accounts.views.signup).
+        ensure_group(USER_GROUP_NAME).user_set.add(*User.objects.filter(username__in=usernames))
+        self.stdout.write(f'{len(usernames) - len(existing)} users created, {len(existing)} updated.')
+
+    def _run_stage(self, sessions, mix, options):
+        names, weights = zip(*mix.items())
+        think = options['think_time'] / 1000
+        samples = defaultdict(list)  # action -> latencies (ms)
+        outcomes = Counter()
+        lock = threading.Lock()
+        stop_at = time.monotonic() + options['duration']
+
+        def user(session, rng):
+            while time.monotonic() < stop_at:
+                action = rng.choices(names, weights)[0]
+                started = time.perf_counter()
+                status, body = self._act(session, action, rng)
+                elapsed = (time.perf_counter() - started) * 1000
+                if status is None:
+                    outcome = 'timeout'
+                elif status >= 500 and LOCK_MESSAGE in body:
+                    outcome = 'lock_timeout'
+                elif status >= 400:
+                    outcome = 'error'
+                else:
+                    outcome = 'ok'
+                with lock:
+                    samples[action].append(elapsed)
+                    outcomes[outcome] += 1
+                if think:
+                    time.sleep(think)
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+            futures = [
+                pool.submit(user, session, random.Random(options['seed'] + i)) for i, session in enumerate(sessions)
+            ]
+            for future in futures:
+                future.result()
+        elapsed = time.monotonic() - started
+
+        total = sum(outcomes.values())
+        latencies = sorted(t for values in samples.values() for t in values)
+        return {
+            'users': len(sessions),
+            'seconds': round(elapsed, 3),
+            'requests': total,
+            'throughput_rps': round(total / elapsed, 2),
+            'error_rate': round((total - outcomes['ok']) / total, 4) if total else 0,
+            'lock_timeout_rate': round(outcomes['lock_timeout'] / total, 4) if total else 0,
+            'outcomes': dict(outcomes),
+            'latency_ms': self._distribution(latencies),
+            'actions': {action: self._distribution(sorted(values)) for action, values in sorted(samples.items())},
+        }
+
+    def _act(self, session, action, rng):
+        """Run one `action` for `session`; return (status, body)."""
+        if action in ('toggle', 'delete') and not session.task_ids:
+            session.refresh_task_ids()
+        if action == 'undo' and not session.deleted:
+            action = 'delete' if session.task_ids else 'list'
+        if action in ('toggle', 'delete') and not session.task_ids:
+            action = 'create'
+
+        if action == 'list':
+            return session.request('GET', reverse('tasks:task_list'))
+        if action == 'create':
+            due = timezone.localtime() + timedelta(hours=rng.randint(1, 24 * 14))
+            return session.request('POST', reverse('tasks:task_list'), {
+                'title': f'Load test task {rng.randrange(10**6)}',
+                'priority': rng.choice(('high', 'medium', 'low')),
+                'due_date': due.strftime('%Y-%m-%dT%H:%M'),
+                'csrfmiddlewaretoken': session.cookie(settings.CSRF_COOKIE_NAME),
+            })
+        if action == 'toggle':
+            return session.request('POST', reverse('tasks:toggle_task_ajax', args=[rng.choice(session.task_ids)]))
+        if action == 'delete':
+            pk = session.task_ids.pop(rng.randrange(len(session.task_ids)))
+            status, body = session.request('POST', reverse('tasks:delete_task_ajax', args=[pk]))
+            if status == 200:
+                session.deleted.append(pk)
+            return status, body
+        pk = session.deleted.pop()
+        status, body = session.request('POST', reverse('tasks:undo_delete', args=[pk]))
+        if status == 200:
+            session.task_ids.append(pk)
+        return status, body
+
+    def _distribution(self, latencies):
+        if not latencies:
+            return {'count': 0}
+        return {
+            'count': len(latencies),
+            'mean': round(statistics.fmean(latencies), 2),
+            'p50': round(_percentile(latencies, 50), 2),
+            'p90': round(_percentile(latencies, 90), 2),
+            'p95': round(_percentile(latencies, 95), 2),
+            'p99': round(_percentile(latencies, 99), 2),
+            'max': round(latencies[-1], 2),
+        }
+
+    def _print_stage(self, stage):
+        latency = stage['latency_ms']
+        self.stdout.write(
+            f"{stage['users']:>4} users  {stage['requests']:>7} requests  {stage['throughput_rps']:8.1f} req/s  "
+            f"errors={stage['error_rate']:.2%}  lock timeouts={stage['lock_timeout_rate']:.2%}  "
+            f"p50={latency.get('p50', 0):.1f}ms  p95={latency.get('p95', 0):.1f}ms  p99={latency.get('p99', 0):.1f}ms"
+        )
+        for action, dist in stage['actions'].items():
+            self.stdout.write(
+                f"       {action:<7} n={dist['count']:>6}  p50={dist['p50']:8.1f}ms  "
+                f"p95={dist['p95']:8.1f}ms  max={dist['max']:8.1f}ms"
+            )
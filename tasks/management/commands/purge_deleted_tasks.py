@@ -0,0 +1,54 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.utils import timezone
+
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Hard-delete soft-deleted tasks older than the retention period, in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=getattr(settings, 'TASK_TOMBSTONE_RETENTION_DAYS', 30),
+            help='Keep tombstones younger than this many days',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows deleted per transaction')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between chunks')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired tombstones')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        batch_size = max(1, options['batch_size'])
+        expired = Task.all_objects.filter(deleted_at__lte=cutoff)
+
+        if options['dry_run']:
+            self.stdout.write(f"{expired.count()} tombstones older than {options['days']} days.")
+            return
+
+        # Raw DELETE over the tombstone index: QuerySet.delete() would load every
+        # row to send post_delete, and tombstones are already gone from the task
+        # list cache and the search index.
+        table = Task._meta.db_table
+        sql = (
+            f"DELETE FROM {table} WHERE id IN "
+            f"(SELECT id FROM {table} WHERE deleted_at IS NOT NULL AND deleted_at <= %s LIMIT %s)"
+        )
+        params = [connection.ops.adapt_datetimefield_value(cutoff), batch_size]
+        total = 0
+        while True:
+            # Short transactions keep the write lock free for requests in between.
+            with transaction.atomic(), connection.cursor() as cursor:
+                cursor.execute(sql, params)
+                deleted = cursor.rowcount
+            total += deleted
+            if deleted < batch_size:
+                break
+            if options['pause']:
+                time.sleep(options['pause'])
+
+        self.stdout.write(self.style.SUCCESS(f"Purged {total} tombstones older than {options['days']} days."))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+from django.db import DEFAULT_DB_ALIAS
+
+from tasks.search import SEARCH_TABLE, has_search_index, install_search_triggers
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the FTS5 task search index and re-install its sync triggers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default=DEFAULT_DB_ALIAS, help='Database alias to rebuild')
+
+    def handle(self, *args, **options):
+        if not has_search_index():
+            self.stderr.write(f"No {SEARCH_TABLE} table; run migrate on SQLite with FTS5 first.")
+            return
+        install_search_triggers(options['database'], rebuild=True)
+        self.stdout.write(self.style.SUCCESS("Task search index rebuilt."))
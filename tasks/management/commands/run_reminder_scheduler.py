@@ -0,0 +1,149 @@
+import heapq
+import time
+from datetime import timedelta
+from itertools import groupby
+
+from django.core.mail import get_connection
+from django.db.models import Max
+from django.utils import timezone
+
+from tasks.management.commands.send_reminders import Command as SendRemindersCommand
+from tasks.models import Task
+
+WATERMARK_OVERLAP = timedelta(seconds=5)
+
+
+class Command(SendRemindersCommand):
+    help = 'Run a long-lived scheduler that sends task reminders when they fall due (replaces cron + send_reminders)'
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument('--poll-interval', type=int, default=60, help='Seconds between checks for new tasks')
+        parser.add_argument('--horizon', type=int, default=24, help='Hours beyond the reminder window to keep queued in memory')
+
+    def handle(self, *args, **options):
+        self.hours = options['hours']
+        self.lead = timedelta(hours=self.hours)
+        self.horizon = timedelta(hours=options['horizon'])
+        self.dry = options['dry_run']
+        self.digest = options['digest']
+        self.batch_size = max(1, options['batch_size'])
+        poll_interval = max(1, options['poll_interval'])
+
+        # Min-heap of (fire_at, task pk). `queued` maps each task to its live
+        # fire time; heap entries that no longer match it are stale and skipped.
+        self.heap = []
+        self.queued = {}
+        # Watermarks: latest updated_at seen, and the due_date up to which tasks are loaded.
+        self.modified_since = Task.objects.aggregate(m=Max('updated_at'))['m'] or timezone.now()
+        self.recent = {}
+        self.loaded_until = timezone.now()
+
+        self.stdout.write(f"Reminder scheduler started (lookahead {self.hours}h, poll every {poll_interval}s).")
+        try:
+            while True:
+                now = timezone.now()
+                self._extend_window(now)
+                self._poll_changed_tasks(now)
+                self._fire_due(now)
+
+                sleep_for = poll_interval
+                if self.heap:
+                    until_next = (self.heap[0][0] - timezone.now()).total_seconds()
+                    sleep_for = min(sleep_for, max(0, until_next))
+                time.sleep(sleep_for)
+        except KeyboardInterrupt:
+            self.stdout.write(self.style.SUCCESS("Reminder scheduler stopped."))
+
+    def _push(self, pk, due_date):
+        fire_at = due_date - self.lead
+        if self.queued.get(pk) == fire_at:
+            return
+        heapq.heappush(self.heap, (fire_at, pk))
+        self.queued[pk] = fire_at
+
+    def _extend_window(self, now):
+        """Queue tasks whose due date has just entered the in-memory horizon.
+
+        Only the slice (loaded_until, now + lookahead + horizon] is queried, so
+        each pass reads new rows from the due_date index instead of rescanning.
+        """
+        until = now + self.lead + self.horizon
+        if until <= self.loaded_until:
+            return
+        rows = Task.objects.filter(
+            completed=False,
+            due_date__gt=max(self.loaded_until, now),
+            due_date__lte=until,
+        ).values_list('pk', 'due_date')
+        for pk, due_date in rows.iterator(chunk_size=self.batch_size):
+            self._push(pk, due_date)
+        self.loaded_until = until
+
+    def _poll_changed_tasks(self, now):
+        """Queue or re-queue tasks created or modified since the last poll.
+
+        Uses the updated_at index as a watermark. The window is re-read with a
+        small overlap so rows committed slightly out of order are not missed;
+        rows already handled at the same updated_at are skipped.
+        """
+        rows = Task.objects.filter(
+            updated_at__gte=self.modified_since - WATERMARK_OVERLAP,
+        ).order_by('updated_at').values_list('pk', 'due_date', 'completed', 'updated_at')
+        for pk, due_date, completed, updated_at in rows.iterator(chunk_size=self.batch_size):
+            if self.recent.get(pk) == updated_at:
+                continue
+            self.recent[pk] = updated_at
+            self.modified_since = max(self.modified_since, updated_at)
+            if completed or not due_date or not now < due_date <= self.loaded_until:
+                # No longer due for a reminder: drop the live entry, if any.
+                self.queued.pop(pk, None)
+            else:
+                self._push(pk, due_date)
+
+        cutoff = self.modified_since - WATERMARK_OVERLAP
+        self.recent = {pk: ts for pk, ts in self.recent.items() if ts >= cutoff}
+
+    def _fire_due(self, now):
+        pks = []
+        while self.heap and self.heap[0][0] <= now:
+            fire_at, pk = heapq.heappop(self.heap)
+            if self.queued.get(pk) != fire_at:
+                continue
+            del self.queued[pk]
+            pks.append(pk)
+        if not pks:
+            return
+
+        connection = None if self.dry else get_connection()
+        if connection is not None:
+            connection.open()
+        try:
+            for start in range(0, len(pks), self.batch_size):
+                self._send(pks[start:start + self.batch_size], connection, now)
+        finally:
+            if connection is not None:
+                connection.close()
+
+    def _send(self, pks, connection, now):
+        # Heap entries can be stale: re-read the rows so completed, deleted or
+        # rescheduled tasks are skipped (or re-queued) instead of reminded.
+        qs = self._pending_reminders(
+            Task.objects.filter(pk__in=pks, completed=False, due_date__gt=now), now, self.hours
+        ).select_related('owner')
+        if self.digest:
+            qs = qs.order_by('owner_id', 'due_date')
+
+        tasks = []
+        for task in qs:
+            if task.due_date - self.lead > now:
+                self._push(task.pk, task.due_date)
+            else:
+                tasks.append(task)
+
+        if self.digest:
+            reminders = [list(group) for _, group in groupby(tasks, key=lambda t: t.owner_id)]
+        else:
+            reminders = [[task] for task in tasks]
+        if reminders:
+            self._deliver(reminders, connection, now)
@@ -1,8 +1,10 @@
 from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.conf import settings
-from django.core.mail import send_mail
+from django.core.mail import EmailMessage, get_connection
+from django.db.models import Q
 from datetime import timedelta
+from itertools import groupby
 
 from tasks.models import Task
 
@@ -13,44 +15,112 @@ class Command(BaseCommand):
     def add_arguments(self, parser):
         parser.add_argument('--hours', type=int, default=24, help='Look ahead window in hours')
         parser.add_argument('--dry-run', action='store_true', help='Print reminders instead of sending emails')
+        parser.add_argument('--batch-size', type=int, default=100, help='Number of reminders sent and recorded per chunk')
+        parser.add_argument('--digest', action='store_true', help='Send one summary email per user instead of one per task')
 
     def handle(self, *args, **options):
         hours = options['hours']
         dry = options['dry_run']
+        batch_size = max(1, options['batch_size'])
+        digest = options['digest']
         now = timezone.now()
         window = now + timedelta(hours=hours)
 
-        qs = Task.objects.filter(
+        qs = self._pending_reminders(Task.objects.filter(
             completed=False,
             due_date__isnull=False,
             due_date__lte=window,
             due_date__gte=now,
-        ).select_related('owner')
+        ), now, hours).select_related('owner').order_by('due_date')
+
+        if digest:
+            # Sorting by owner in SQL lets the stream be grouped without buffering.
+            qs = qs.order_by('owner_id', 'due_date')
+
+        due = qs.iterator(chunk_size=batch_size)
+        if digest:
+            reminders = (list(tasks) for _, tasks in groupby(due, key=lambda t: t.owner_id))
+        else:
+            reminders = ([task] for task in due)
 
         count = 0
-        for task in qs:
-            owner = task.owner
-            if not owner or not owner.email:
-                continue
+        message_count = 0
+        chunk = []
+        # One SMTP connection for the whole run. It is opened explicitly so the
+        # backend keeps it alive across chunks instead of reconnecting per send.
+        connection = None if dry else get_connection()
+        if connection is not None:
+            connection.open()
+        try:
+            for tasks in reminders:
+                chunk.append(tasks)
+                count += len(tasks)
+                message_count += 1
+                if len(chunk) >= batch_size:
+                    self._deliver(chunk, connection, now)
+                    chunk = []
+
+            if chunk:
+                self._deliver(chunk, connection, now)
+        finally:
+            if connection is not None:
+                connection.close()
+
+        digests = f" in {message_count} digests" if digest else ""
+        self.stdout.write(self.style.SUCCESS(f"Processed {count} due tasks{digests} (lookahead {hours}h)."))
+
+    def _pending_reminders(self, qs, now, hours):
+        """Restrict `qs` to tasks whose owner has an email and that were not reminded recently.
 
-            # avoid sending repeated reminders if recently sent
-            if task.last_reminder_sent and (now - task.last_reminder_sent).total_seconds() < (hours * 3600):
-                continue
+        Filtering in SQL keeps already-reminded tasks from being fetched at all.
+        """
+        recently = now - timedelta(hours=hours)
+        return qs.filter(
+            Q(last_reminder_sent__isnull=True) | Q(last_reminder_sent__lte=recently),
+            owner__isnull=False,
+        ).exclude(owner__email='')
 
+    def _build_message(self, tasks, connection):
+        owner = tasks[0].owner
+        site_url = settings.SITE_URL if hasattr(settings, 'SITE_URL') else ''
+        if len(tasks) == 1:
+            task = tasks[0]
             subject = f"Reminder: '{task.title}' is due soon"
-            message = f"Hi {owner.username},\n\nThis is a reminder that your task '{task.title}' is due on {task.due_date}.\n\nOpen your tasks: {settings.SITE_URL if hasattr(settings, 'SITE_URL') else ''}\n\n— ToDo"
-            recipient = [owner.email]
+            message = f"Hi {owner.username},\n\nThis is a reminder that your task '{task.title}' is due on {task.due_date}.\n\nOpen your tasks: {site_url}\n\n— ToDo"
+        else:
+            subject = f"Reminder: {len(tasks)} tasks are due soon"
+            lines = "\n".join(f"- {task.title} (due {task.due_date})" for task in tasks)
+            message = f"Hi {owner.username},\n\nThese tasks are due soon:\n\n{lines}\n\nOpen your tasks: {site_url}\n\n— ToDo"
+        return EmailMessage(subject, message, settings.DEFAULT_FROM_EMAIL, [owner.email], connection=connection)
 
-            if dry:
-                self.stdout.write(f"Would send to {owner.email}: {subject}")
-            else:
+    def _deliver(self, reminders, connection, now):
+        """Send one chunk of reminders and record the delivered tasks with a single UPDATE.
+
+        Each reminder is the list of tasks covered by one email: a single task,
+        or all of an owner's due tasks in digest mode. Messages go out one at a
+        time over the shared connection, so a failure only leaves its own
+        reminder unrecorded (and retried on the next run), not the whole chunk.
+        """
+        messages = [self._build_message(tasks, connection) for tasks in reminders]
+
+        if connection is None:
+            for tasks, msg in zip(reminders, messages):
+                self.stdout.write(f"Would send to {tasks[0].owner.email}: {msg.subject}")
+            return
+
+        delivered = []
+        try:
+            for tasks, msg in zip(reminders, messages):
                 try:
-                    send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, recipient)
-                    task.last_reminder_sent = now
-                    task.save(update_fields=['last_reminder_sent'])
-                    self.stdout.write(f"Sent reminder to {owner.email} for task {task.pk}\n")
+                    sent = connection.send_messages([msg])
                 except Exception as e:
-                    self.stderr.write(f"Failed to send to {owner.email}: {e}\n")
-            count += 1
-
-        self.stdout.write(self.style.SUCCESS(f"Processed {count} due tasks (lookahead {hours}h)."))
+                    self.stderr.write(f"Failed to send reminder to {tasks[0].owner.email}: {e}\n")
+                    continue
+                if sent:
+                    delivered.extend(tasks)
+        finally:
+            # Also record what went out before an interrupt, so it is not sent twice.
+            if delivered:
+                Task.objects.filter(pk__in=[task.pk for task in delivered]).update(last_reminder_sent=now)
+        for task in delivered:
+            self.stdout.write(f"Sent reminder to {task.owner.email} for task {task.pk}\n")
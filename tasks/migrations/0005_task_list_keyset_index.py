@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:37
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_alter_task_options_task_last_reminder_sent_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='tasks_task_owner_i_130d62_idx',
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['owner', 'completed', 'due_date', 'id'], name='tasks_task_owner_i_4a0030_idx'),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:40
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_task_list_keyset_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False), ('due_date__isnull', False)), fields=['due_date'], name='tasks_task_reminder_due_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+from django.db import DatabaseError, migrations
+
+SEARCH_TABLE = "tasks_task_search"
+
+
+def create_task_search(apps, schema_editor):
+    """Create an FTS5 index over Task.title, with owner_id indexed for scoping.
+
+    SQLite only. Other backends, or SQLite builds without FTS5, skip this and
+    task search falls back to icontains. The sync triggers are installed after
+    every migrate by tasks.search.install_search_triggers, because SQLite drops
+    triggers whenever a later migration rebuilds the task table.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    task_table = apps.get_model("tasks", "Task")._meta.db_table
+    with connection.cursor() as cursor:
+        try:
+            cursor.execute(
+                f"CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5("
+                f"title, owner_id, content='{task_table}', content_rowid='id', "
+                f"tokenize='unicode61 remove_diacritics 2', prefix='2 3')"
+            )
+        except DatabaseError:
+            return
+        # Rank on the title only; owner_id is there to scope matches.
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rank) VALUES ('rank', 'bm25(1.0, 0.0)')")
+
+
+def drop_task_search(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor != "sqlite":
+        return
+    with connection.cursor() as cursor:
+        for suffix in ("ai", "ad", "au"):
+            cursor.execute(f"DROP TRIGGER IF EXISTS {SEARCH_TABLE}_{suffix}")
+        cursor.execute(f"DROP TABLE IF EXISTS {SEARCH_TABLE}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_reminder_partial_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_task_search, drop_task_search),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 17:56
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def drop_search_triggers(apps, schema_editor):
+    # The search triggers now skip tombstones; drop the old ones so the
+    # post_migrate hook (tasks.search.install_search_triggers) recreates them
+    # and rebuilds the index.
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    with schema_editor.connection.cursor() as cursor:
+        for suffix in ('ai', 'ad', 'au'):
+            cursor.execute(f'DROP TRIGGER IF EXISTS tasks_task_search_{suffix}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='deleted_at',
+            field=models.DateTimeField(blank=True, default=None, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='tasks_task_tombstone_idx'),
+        ),
+        migrations.RunPython(drop_search_triggers, drop_search_triggers),
+    ]
@@ -1,5 +1,38 @@
+from asgiref.sync import sync_to_async
 from django.db import models
 from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_task_list_version
+from .events import notify_task_changed
+
+
+class TaskQuerySet(models.QuerySet):
+    def soft_delete(self):
+        """Tombstone the matching tasks with one UPDATE. Like any queryset
+        update() this skips the Task signals, so callers bump the list cache."""
+        now = timezone.now()
+        return self.filter(deleted_at__isnull=True).update(deleted_at=now, updated_at=now)
+
+    def restore(self):
+        """Bring tombstoned tasks back with one UPDATE (see soft_delete)."""
+        return self.filter(deleted_at__isnull=False).update(deleted_at=None, updated_at=timezone.now())
+
+    async def asoft_delete(self):
+        return await sync_to_async(self.soft_delete)()
+
+    async def arestore(self):
+        return await sync_to_async(self.restore)()
+
+
+class TaskManager(models.Manager.from_queryset(TaskQuerySet)):
+    """Default manager: hides soft-deleted tasks. Use Task.all_objects to see them."""
+
+    def get_queryset(self):
+        return super().get_queryset().filter(deleted_at__isnull=True)
+
 
 class Task(models.Model):
     PRIORITY_CHOICES = [
@@ -20,16 +53,59 @@ class Task(models.Model):
     due_date = models.DateTimeField(null=True, blank=True)
     priority = models.CharField(max_length=10, choices=PRIORITY_CHOICES, default="medium")
     created_at = models.DateTimeField(auto_now_add=True)
+    # Set on every save. Queryset update() calls must set it explicitly.
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     # Timestamp of the last reminder sent for this task (helps avoid duplicate reminders)
     last_reminder_sent = models.DateTimeField(null=True, blank=True, default=None)
+    # Soft-delete tombstone; purged for good by the purge_deleted_tasks command.
+    deleted_at = models.DateTimeField(null=True, blank=True, default=None)
+
+    objects = TaskManager()
+    all_objects = models.Manager.from_queryset(TaskQuerySet)()
 
     class Meta:
         ordering = ["-created_at"]
         indexes = [
-            models.Index(fields=["owner", "completed"]),
+            # Covers the task list sort (see tasks.pagination.TASK_LIST_ORDERING)
+            # and makes the old (owner, completed) index redundant. Partial on
+            # live rows, so the manager's tombstone filter needs no table lookup.
+            models.Index(
+                fields=["owner", "completed", "due_date", "id"],
+                condition=models.Q(deleted_at__isnull=True),
+                name="tasks_task_list_idx",
+            ),
             models.Index(fields=["owner", "priority"]),
             models.Index(fields=["owner", "due_date"]),
+            # MAX(updated_at) per owner for the conditional-GET validator.
+            models.Index(fields=["owner", "updated_at"]),
+            # Partial index for the reminder scan: only open tasks with a due date.
+            models.Index(
+                fields=["due_date"],
+                condition=models.Q(completed=False, due_date__isnull=False),
+                name="tasks_task_reminder_due_idx",
+            ),
+            # Tombstones only, for undo and the purge scan.
+            models.Index(
+                fields=["deleted_at"],
+                condition=models.Q(deleted_at__isnull=False),
+                name="tasks_task_tombstone_idx",
+            ),
         ]
 
     def __str__(self):
         return f"{self.title} ({self.priority})"
+
+
+@receiver([post_save, post_delete], sender=Task)
+def invalidate_task_list_cache(sender, instance, **kwargs):
+    bump_task_list_version(instance.owner_id)
+
+
+@receiver(post_save, sender=Task)
+def publish_saved_task(sender, instance, created, **kwargs):
+    notify_task_changed(instance.owner_id, [instance.pk], "create" if created else "update")
+
+
+@receiver(post_delete, sender=Task)
+def publish_deleted_task(sender, instance, **kwargs):
+    notify_task_changed(instance.owner_id, [instance.pk], "delete")
@@ -0,0 +1,99 @@
+from django.db.models import F, Q
+from django.utils.dateparse import parse_datetime
+from django.utils.http import urlsafe_base64_decode, urlsafe_base64_encode
+
+# Sort key for the task list. It must match the composite index on Task
+# (owner, completed, due_date, id) so each page is a single index range scan.
+TASK_LIST_ORDERING = ("completed", F("due_date").asc(nulls_first=True), "id")
+
+DEFAULT_PAGE_SIZE = 50
+
+
+def encode_cursor(task) -> str:
+    """Encode the sort key of `task` as an opaque, URL-safe cursor."""
+    due = task.due_date.isoformat() if task.due_date else ""
+    raw = f"{int(task.completed)}|{due}|{task.pk}"
+    return urlsafe_base64_encode(raw.encode())
+
+
+def decode_cursor(cursor):
+    """Return (completed, due_date, pk) from a cursor, or None if it is invalid."""
+    try:
+        completed, due, pk = urlsafe_base64_decode(cursor).decode().split("|")
+        due_date = parse_datetime(due) if due else None
+        if due and due_date is None:
+            return None
+        return completed == "1", due_date, int(pk)
+    except (ValueError, TypeError, UnicodeDecodeError):
+        return None
+
+
+def _ranges_after(completed, due_date, pk):
+    """The rows after (completed, due_date, pk) in TASK_LIST_ORDERING, as
+    filters that each select one contiguous range of the composite index.
+
+    A single OR of these would only let SQLite seek on owner_id and test
+    the rest row by row, so each range is queried on its own, in order.
+    NULL due dates sort first: a NULL key is followed by the remaining NULL
+    rows, then by every dated row with the same completed flag.
+    """
+    # Django renders completed=<bool> as a bare (NOT) "completed" term, which
+    # SQLite won't use as an index equality; a one-value IN becomes "= ?".
+    group = Q(completed__in=[completed])
+    if due_date is None:
+        ranges = [
+            group & Q(due_date__isnull=True, pk__gt=pk),
+            group & Q(due_date__isnull=False),
+        ]
+    else:
+        ranges = [
+            group & Q(due_date=due_date, pk__gt=pk),
+            group & Q(due_date__gt=due_date),
+        ]
+    if not completed:
+        ranges.append(Q(completed__in=[True]))
+    return ranges
+
+
+def _page_querysets(queryset, cursor):
+    """Querysets whose results, concatenated, are the rows after `cursor`."""
+    qs = queryset.order_by(*TASK_LIST_ORDERING)
+    key = decode_cursor(cursor) if cursor else None
+    if key is None:
+        return [qs]
+    return [qs.filter(q) for q in _ranges_after(*key)]
+
+
+def paginate_tasks(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Return (tasks, next_cursor) for one keyset page of `queryset`.
+
+    Cost is independent of how deep the page is: the cursor becomes index
+    range seeks on the sort key instead of an OFFSET. Usually the first
+    range fills the page; a page crossing a group boundary takes up to
+    three queries.
+    """
+    tasks = []
+    for qs in _page_querysets(queryset, cursor):
+        # One extra row tells whether there is a next page.
+        tasks.extend(qs[: page_size + 1 - len(tasks)])
+        if len(tasks) > page_size:
+            break
+    return _split_page(tasks, page_size)
+
+
+async def apaginate_tasks(queryset, cursor=None, page_size=DEFAULT_PAGE_SIZE):
+    """Async version of paginate_tasks()."""
+    tasks = []
+    for qs in _page_querysets(queryset, cursor):
+        tasks.extend([task async for task in qs[: page_size + 1 - len(tasks)]])
+        if len(tasks) > page_size:
+            break
+    return _split_page(tasks, page_size)
+
+
+def _split_page(tasks, page_size):
+    next_cursor = None
+    if len(tasks) > page_size:
+        tasks = tasks[:page_size]
+        next_cursor = encode_cursor(tasks[-1])
+    return tasks, next_cursor
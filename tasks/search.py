@@ -0,0 +1,106 @@
+import re
+from functools import lru_cache
+
+from django.db import connection, connections
+
+from .models import Task
+
+# FTS5 table created by tasks/migrations/0007_task_search_fts.py.
+SEARCH_TABLE = "tasks_task_search"
+
+DEFAULT_PAGE_SIZE = 20
+
+# Soft-deleted tasks (deleted_at set) are kept out of the index.
+_TRIGGERS = {
+    f"{SEARCH_TABLE}_ai": (
+        "AFTER INSERT ON {tasks} WHEN new.deleted_at IS NULL BEGIN "
+        "INSERT INTO {fts}(rowid, title, owner_id) VALUES (new.id, new.title, new.owner_id); END"
+    ),
+    f"{SEARCH_TABLE}_ad": (
+        "AFTER DELETE ON {tasks} WHEN old.deleted_at IS NULL BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, title, owner_id) VALUES ('delete', old.id, old.title, old.owner_id); END"
+    ),
+    f"{SEARCH_TABLE}_au": (
+        "AFTER UPDATE OF title, owner_id, deleted_at ON {tasks} BEGIN "
+        "INSERT INTO {fts}({fts}, rowid, title, owner_id) "
+        "SELECT 'delete', old.id, old.title, old.owner_id WHERE old.deleted_at IS NULL; "
+        "INSERT INTO {fts}(rowid, title, owner_id) "
+        "SELECT new.id, new.title, new.owner_id WHERE new.deleted_at IS NULL; END"
+    ),
+}
+
+
+def install_search_triggers(using="default", rebuild=False) -> None:
+    """(Re)create the triggers that keep the search table in sync with Task.
+
+    SQLite drops a table's triggers when a migration rebuilds it, so this runs
+    after every migrate. The index is rebuilt if any trigger was missing (or
+    when `rebuild` is set), since rows may have changed while it was not
+    maintained.
+    """
+    conn = connections[using]
+    if conn.vendor != "sqlite" or SEARCH_TABLE not in conn.introspection.table_names():
+        return
+    tasks = Task._meta.db_table
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = %s", [tasks]
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        missing = [name for name in _TRIGGERS if name not in existing]
+        for name in missing:
+            cursor.execute(f"CREATE TRIGGER {name} " + _TRIGGERS[name].format(tasks=tasks, fts=SEARCH_TABLE))
+        if missing or rebuild:
+            # Not FTS5's 'rebuild', which would index every row including tombstones.
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('delete-all')")
+            cursor.execute(
+                f"INSERT INTO {SEARCH_TABLE}(rowid, title, owner_id) "
+                f"SELECT id, title, owner_id FROM {tasks} WHERE deleted_at IS NULL"
+            )
+            cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('optimize')")
+
+
+@lru_cache(maxsize=None)
+def _search_index_available(db_name) -> bool:
+    return SEARCH_TABLE in connection.introspection.table_names()
+
+
+def has_search_index() -> bool:
+    return connection.vendor == "sqlite" and _search_index_available(str(connection.settings_dict["NAME"]))
+
+
+def _match_expression(owner_id, q):
+    """FTS5 query: every word of `q` as a title prefix, scoped to the owner."""
+    words = re.findall(r"\w+", q)
+    if not words:
+        return None
+    terms = " AND ".join('title:"{}"*'.format(word.replace('"', '""')) for word in words)
+    return f"owner_id:{int(owner_id)} AND {terms}"
+
+
+def search_tasks(owner, q, page=1, page_size=DEFAULT_PAGE_SIZE):
+    """Return (tasks, has_next) for one page of `owner`'s tasks matching `q`.
+
+    With the FTS5 index results are ranked by bm25 on the title; without it
+    they fall back to an icontains filter in task-list order.
+    """
+    offset = (page - 1) * page_size
+    if not has_search_index():
+        qs = Task.objects.filter(owner=owner, title__icontains=q.strip()).order_by("completed", "due_date", "id")
+        tasks = list(qs[offset:offset + page_size + 1])
+        return tasks[:page_size], len(tasks) > page_size
+
+    match = _match_expression(owner.pk, q)
+    if match is None:
+        return [], False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT rowid FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank LIMIT %s OFFSET %s",
+            [match, page_size + 1, offset],
+        )
+        ids = [row[0] for row in cursor.fetchall()]
+
+    has_next = len(ids) > page_size
+    ids = ids[:page_size]
+    found = Task.objects.filter(owner=owner).in_bulk(ids)
+    return [found[pk] for pk in ids if pk in found], has_next
@@ -1,3 +1,769 @@
-from django.test import TestCase
+import asyncio
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.core import mail
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.mail.backends import locmem
+from django.core.management import call_command
+from django.db import connection
+from django.test import AsyncClient, RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import include, path, reverse
+from django.utils import timezone
+
+from todo.testing import PLAIN_STATIC
+
+from . import async_views
+from .conditional import task_list_etag, task_list_last_modified
+from .events import (
+    MAX_PENDING_EVENTS,
+    event_stream,
+    has_subscribers,
+    notify_refresh,
+    notify_task_changed,
+    publish,
+    subscribe,
+    unsubscribe,
+)
+from .management.commands.send_reminders import Command as SendRemindersCommand
+from .models import Task
+from .pagination import TASK_LIST_ORDERING, _page_querysets, encode_cursor, paginate_tasks
+from .search import has_search_index, search_tasks
+from .urls import task_urlpatterns
+
+User = get_user_model()
+
+
+class TaskBatchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def batch(self, *operations):
+        response = self.client.post(
+            reverse("tasks:task_batch"), json.dumps({"operations": list(operations)}), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.json()["results"]
+
+    def test_operations_run_in_request_order(self):
+        task = Task.objects.create(owner=self.user, title="A")
+
+        results = self.batch({"op": "complete_all"}, {"op": "toggle", "id": task.pk})
+
+        self.assertEqual(results[0]["count"], 1)
+        self.assertEqual(results[1]["status"], "ok")
+        task.refresh_from_db()
+        self.assertFalse(task.completed)
+
+    def test_toggle_then_complete_all(self):
+        task = Task.objects.create(owner=self.user, title="A")
+
+        results = self.batch({"op": "toggle", "id": task.pk}, {"op": "complete_all"})
+
+        self.assertEqual(results[1]["count"], 0)
+        task.refresh_from_db()
+        self.assertTrue(task.completed)
+
+    def test_last_priority_wins(self):
+        task = Task.objects.create(owner=self.user, title="A", priority="medium")
+
+        results = self.batch(
+            {"op": "set_priority", "id": task.pk, "priority": "high"},
+            {"op": "set_priority", "id": task.pk, "priority": "low"},
+            {"op": "set_priority", "id": task.pk, "priority": "high"},
+        )
+
+        self.assertEqual([r["priority"] for r in results], ["high", "low", "high"])
+        task.refresh_from_db()
+        self.assertEqual(task.priority, "high")
+
+    def test_double_toggle_is_a_no_op(self):
+        task = Task.objects.create(owner=self.user, title="A")
+
+        self.batch({"op": "toggle", "id": task.pk}, {"op": "toggle", "id": task.pk})
+
+        task.refresh_from_db()
+        self.assertFalse(task.completed)
+
+    def test_operations_after_delete_do_not_find_the_task(self):
+        task = Task.objects.create(owner=self.user, title="A")
+
+        results = self.batch({"op": "delete", "id": task.pk}, {"op": "toggle", "id": task.pk})
+
+        self.assertEqual(results[0]["status"], "ok")
+        self.assertEqual(results[1]["message"], "Task not found")
+        self.assertFalse(Task.objects.filter(pk=task.pk).exists())
+        self.assertTrue(Task.all_objects.filter(pk=task.pk).exists())
+
+    def test_create_and_clear_completed(self):
+        done = Task.objects.create(owner=self.user, title="Done", completed=True)
+
+        results = self.batch(
+            {"op": "create", "title": "New", "priority": "low"},
+            {"op": "create", "title": ""},
+            {"op": "clear_completed"},
+            {"op": "toggle", "id": done.pk},
+        )
+
+        self.assertEqual(results[0]["status"], "ok")
+        self.assertEqual(Task.objects.get(pk=results[0]["id"]).priority, "low")
+        self.assertEqual(results[1]["message"], "Invalid task")
+        self.assertEqual(results[2]["count"], 1)
+        self.assertEqual(results[3]["message"], "Task not found")
+        self.assertEqual(list(Task.objects.filter(owner=self.user).values_list("title", flat=True)), ["New"])
+
+    def test_other_users_tasks_are_not_found(self):
+        other = Task.objects.create(owner=User.objects.create_user("bob"), title="B")
+
+        results = self.batch({"op": "toggle", "id": other.pk})
+
+        self.assertEqual(results[0]["message"], "Task not found")
+        other.refresh_from_db()
+        self.assertFalse(other.completed)
+
+    def test_invalid_ids_and_operations(self):
+        results = self.batch({"op": "toggle", "id": 10**20}, {"op": "delete"}, {"op": "explode"})
+
+        self.assertEqual(
+            [r["message"] for r in results], ["Missing or invalid id", "Missing or invalid id", "Unknown operation"]
+        )
+
+    def test_malformed_payload(self):
+        response = self.client.post(reverse("tasks:task_batch"), "[]", content_type="application/json")
+        self.assertEqual(response.status_code, 400)
+        response = self.client.post(
+            reverse("tasks:task_batch"), json.dumps({"operations": "nope"}), content_type="application/json"
+        )
+        self.assertEqual(response.json()["message"], "'operations' must be a list")
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class TaskTransferTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice", password="pw")
+        self.client.force_login(self.user)
+
+    def upload(self, name, content):
+        return self.client.post(reverse("tasks:task_import"), {"file": SimpleUploadedFile(name, content)})
+
+    def round_trip(self, fmt):
+        overdue = timezone.now() - timedelta(days=3)
+        Task.objects.create(owner=self.user, title="Overdue", due_date=overdue, priority="high", completed=True)
+        Task.objects.create(owner=self.user, title="Plain")
+        Task.objects.create(owner=User.objects.create_user("bob"), title="Not mine")
+
+        response = self.client.get(reverse("tasks:task_export"), {"format": fmt})
+        body = b"".join(response.streaming_content)
+        self.assertNotIn(b"Not mine", body)
+
+        report = self.upload(f"tasks.{fmt}", body).json()
+
+        self.assertEqual((report["created"], report["failed"]), (2, 0))
+        copy = Task.objects.filter(owner=self.user, title="Overdue").latest("pk")
+        self.assertEqual((copy.due_date, copy.priority, copy.completed), (overdue, "high", True))
+
+    def test_csv_round_trip_keeps_overdue_tasks(self):
+        self.round_trip("csv")
+
+    def test_ndjson_round_trip_keeps_overdue_tasks(self):
+        self.round_trip("ndjson")
+
+    def test_bad_rows_are_reported_by_line(self):
+        content = b"title,priority,completed\nGood,low,false\n,low,false\nBad priority,urgent,no\nBad flag,low,maybe\n"
+
+        report = self.upload("tasks.csv", content).json()
+
+        self.assertEqual((report["created"], report["failed"]), (1, 3))
+        self.assertEqual([e["line"] for e in report["errors"]], [3, 4, 5])
+        self.assertIn("completed", report["errors"][2]["errors"])
+
+    def test_unreadable_file_after_committed_batches(self):
+        rows = b"".join(b'{"title": "Task %d"}\n' % i for i in range(600))
+        # Caches the empty list.
+        self.assertNotRegex(self.client.get(reverse("tasks:task_list")).content.decode(), r"Task \d+")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.upload("tasks.ndjson", rows + b'{"title": "\xff"}\n')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "partial")
+        self.assertEqual(response.json()["created"], 600)
+        self.assertEqual(Task.objects.filter(owner=self.user).count(), 600)
+        self.assertRegex(self.client.get(reverse("tasks:task_list")).content.decode(), r"Task \d+")
+
+    def test_csv_without_title_column(self):
+        response = self.upload("tasks.csv", b"name\nx\n")
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["status"], "error")
+        self.assertFalse(Task.objects.exists())
+
+
+class TaskPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        now = timezone.now()
+        # Ties on the due date, NULL due dates and both completed states.
+        dues = [None, None, now, now, now + timedelta(days=1), None, now - timedelta(days=1)]
+        for completed in (False, True):
+            for i, due in enumerate(dues):
+                Task.objects.create(owner=self.user, title=f"{completed}-{i}", due_date=due, completed=completed)
+
+    def test_pages_cover_every_task_once_in_order(self):
+        expected = list(Task.objects.filter(owner=self.user).order_by(*TASK_LIST_ORDERING))
+
+        seen, cursor = [], None
+        while True:
+            tasks, cursor = paginate_tasks(Task.objects.filter(owner=self.user), cursor=cursor, page_size=3)
+            seen.extend(tasks)
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, expected)
+        self.assertFalse(expected[0].completed)
+        self.assertIsNone(expected[0].due_date)
+
+    def test_invalid_cursor_starts_over(self):
+        first, _ = paginate_tasks(Task.objects.filter(owner=self.user), page_size=3)
+
+        for cursor in ("garbage", encode_cursor(first[0])[:-2] + "!!"):
+            with self.subTest(cursor=cursor):
+                tasks, _ = paginate_tasks(Task.objects.filter(owner=self.user), cursor=cursor, page_size=3)
+                self.assertEqual(tasks, first)
+
+    @override_settings(TASKS_PAGE_SIZE=5)
+    def test_json_api_follows_next_cursor(self):
+        self.client.force_login(self.user)
+        ids, params = [], {}
+        while True:
+            data = self.client.get(reverse("tasks:task_list_json"), params).json()
+            ids.extend(task["id"] for task in data["tasks"])
+            if not data["next_cursor"]:
+                break
+            params = {"after": data["next_cursor"]}
+
+        self.assertEqual(len(ids), 14)
+        self.assertEqual(len(set(ids)), 14)
+
+    def vm_steps(self, queryset, cursor):
+        steps = 0
+
+        def tick():
+            nonlocal steps
+            steps += 1
+
+        connection.ensure_connection()
+        connection.connection.set_progress_handler(tick, 1)
+        try:
+            paginate_tasks(queryset, cursor=cursor, page_size=20)
+        finally:
+            connection.connection.set_progress_handler(None, 1)
+        return steps
+
+    def test_deep_pages_seek_the_index(self):
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(owner=self.user, title=f"Bulk {i}", due_date=now + timedelta(minutes=i), completed=i % 2 == 0)
+            for i in range(600)
+        )
+        tasks = Task.objects.filter(owner=self.user)
+        ordered = list(tasks.order_by(*TASK_LIST_ORDERING))
+        shallow, deep = encode_cursor(ordered[20]), encode_cursor(ordered[-40])
+
+        for queryset in _page_querysets(tasks, deep):
+            plan = queryset[:21].explain()
+            self.assertIn("USING INDEX tasks_task_list_idx (owner_id=? AND completed=?", plan)
+            self.assertNotIn("TEMP B-TREE", plan)
+        # Rows examined don't grow with depth.
+        self.assertLess(self.vm_steps(tasks, deep), self.vm_steps(tasks, shallow) * 1.5)
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(owner=self.user, title="A")
+
+    def test_delete_and_undo(self):
+        response = self.client.post(reverse("tasks:delete_task_ajax", args=[self.task.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+        self.assertIsNotNone(Task.all_objects.get(pk=self.task.pk).deleted_at)
+
+        response = self.client.post(reverse("tasks:undo_delete", args=[self.task.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(Task.objects.get(pk=self.task.pk).deleted_at)
+
+        # Nothing left to undo, and a deleted task can't be deleted again.
+        self.assertEqual(self.client.post(reverse("tasks:undo_delete", args=[self.task.pk])).status_code, 404)
+        self.client.post(reverse("tasks:delete_task_ajax", args=[self.task.pk]))
+        self.assertEqual(self.client.post(reverse("tasks:delete_task_ajax", args=[self.task.pk])).status_code, 404)
+
+    def test_other_users_cannot_delete_or_undo(self):
+        self.client.force_login(User.objects.create_user("bob"))
+
+        self.assertEqual(self.client.post(reverse("tasks:delete_task_ajax", args=[self.task.pk])).status_code, 404)
+        Task.objects.filter(pk=self.task.pk).soft_delete()
+        self.assertEqual(self.client.post(reverse("tasks:undo_delete", args=[self.task.pk])).status_code, 404)
+        self.assertFalse(Task.objects.filter(pk=self.task.pk).exists())
+
+    def test_purge_removes_only_expired_tombstones(self):
+        old = Task.objects.create(owner=self.user, title="Old")
+        recent = Task.objects.create(owner=self.user, title="Recent")
+        Task.objects.filter(pk__in=[old.pk, recent.pk]).soft_delete()
+        Task.all_objects.filter(pk=old.pk).update(deleted_at=timezone.now() - timedelta(days=31))
+
+        call_command("purge_deleted_tasks", days=30, batch_size=1, stdout=StringIO())
+
+        self.assertEqual(set(Task.all_objects.values_list("pk", flat=True)), {self.task.pk, recent.pk})
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class ConditionalGetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(owner=self.user, title="A")
+
+    def get_json(self, **headers):
+        return self.client.get(reverse("tasks:task_list_json"), headers=headers)
+
+    def test_json_not_modified_until_a_change(self):
+        etag = self.get_json()["ETag"]
+        self.assertEqual(self.get_json(if_none_match=etag).status_code, 304)
+
+        response = self.client.post(reverse("tasks:toggle_task_ajax", args=[self.task.pk]))
+        # Mutation responses carry the new validator.
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(self.get_json(if_none_match=response["ETag"]).status_code, 304)
+        self.assertEqual(self.get_json(if_none_match=etag).status_code, 200)
+
+    def test_delete_changes_the_etag(self):
+        etag = self.get_json()["ETag"]
+
+        self.client.post(reverse("tasks:delete_task_ajax", args=[self.task.pk]))
+
+        self.assertEqual(self.get_json(if_none_match=etag).status_code, 200)
+
+    def test_html_list_not_modified(self):
+        self.client.get(reverse("tasks:task_list"))  # sets the CSRF cookie the ETag varies on
+        etag = self.client.get(reverse("tasks:task_list"))["ETag"]
+
+        response = self.client.get(reverse("tasks:task_list"), headers={"if_none_match": etag})
+
+        self.assertEqual(response.status_code, 304)
+
+    def test_profile_edit_changes_the_html_etag(self):
+        self.client.get(reverse("tasks:task_list"))
+        etag = self.client.get(reverse("tasks:task_list"))["ETag"]
+
+        profile = self.user.profile
+        profile.timezone = "Asia/Dhaka"
+        profile.save()
+        response = self.client.get(reverse("tasks:task_list"), headers={"if_none_match": etag})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_html_list_with_a_pending_message_has_no_validator(self):
+        request = RequestFactory().get(reverse("tasks:task_list"))
+        request.user = self.user
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        self.assertIsNotNone(task_list_etag(request))
+
+        messages.success(request, "Task added.")
+
+        self.assertIsNone(task_list_etag(request))
+        self.assertIsNone(task_list_last_modified(request))
+
+
+class SendRemindersTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", email="alice@example.com")
+        soon = timezone.now() + timedelta(hours=1)
+        self.tasks = [Task.objects.create(owner=self.user, title=f"Task {i}", due_date=soon) for i in range(5)]
+
+    def send(self, *args, **options):
+        call_command("send_reminders", *args, stdout=StringIO(), stderr=StringIO(), **options)
+
+    def test_batches_share_an_update_per_chunk(self):
+        Task.objects.create(owner=User.objects.create_user("bob"), title="No email", due_date=self.tasks[0].due_date)
+
+        with CaptureQueriesContext(connection) as queries:
+            self.send(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 5)
+        updates = [q for q in queries.captured_queries if q["sql"].startswith("UPDATE")]
+        self.assertEqual(len(updates), 3)
+        self.assertFalse(Task.objects.filter(owner=self.user, last_reminder_sent__isnull=True).exists())
+
+        # Already reminded within the window: nothing to send.
+        self.send()
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_failure_only_leaves_its_own_reminder_unrecorded(self):
+        send_messages = locmem.EmailBackend.send_messages
+
+        def flaky(backend, messages):
+            if "Task 2" in messages[0].subject:
+                raise OSError("connection reset")
+            return send_messages(backend, messages)
+
+        with mock.patch.object(locmem.EmailBackend, "send_messages", flaky):
+            self.send(batch_size=5)
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(
+            list(Task.objects.filter(last_reminder_sent__isnull=True).values_list("title", flat=True)), ["Task 2"]
+        )
+
+        self.send()
+        self.assertEqual(mail.outbox[-1].subject, "Reminder: 'Task 2' is due soon")
+        self.assertEqual(len(mail.outbox), 5)
+
+    def test_pending_reminders_are_filtered_in_sql(self):
+        now = timezone.now()
+        Task.objects.filter(pk=self.tasks[0].pk).update(last_reminder_sent=now - timedelta(hours=1))
+        Task.objects.filter(pk=self.tasks[1].pk).update(last_reminder_sent=now - timedelta(hours=25))
+        Task.objects.create(owner=User.objects.create_user("bob"), title="No email", due_date=self.tasks[0].due_date)
+        window = Task.objects.filter(
+            completed=False, due_date__isnull=False, due_date__gte=now, due_date__lte=now + timedelta(hours=24)
+        )
+
+        pending = SendRemindersCommand()._pending_reminders(window, now, 24)
+
+        self.assertEqual(set(pending), set(self.tasks[1:]))
+        self.assertIn("USING INDEX tasks_task_reminder_due_idx", pending.explain())
+
+    def test_digest_sends_one_email_per_owner(self):
+        bob = User.objects.create_user("bob", email="bob@example.com")
+        Task.objects.create(owner=bob, title="Bob's task", due_date=self.tasks[0].due_date)
+
+        self.send(digest=True, batch_size=1)
+
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), ["alice@example.com", "bob@example.com"])
+        alice_mail = next(m for m in mail.outbox if m.to == ["alice@example.com"])
+        self.assertEqual(alice_mail.subject, "Reminder: 5 tasks are due soon")
+        self.assertTrue(all(f"- Task {i} (due" in alice_mail.body for i in range(5)))
+        self.assertFalse(Task.objects.filter(last_reminder_sent__isnull=True).exists())
+
+
+class ReminderSchedulerTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", email="alice@example.com")
+        self.start = timezone.now()
+
+    def task(self, title, due_in, **fields):
+        return Task.objects.create(owner=self.user, title=title, due_date=self.start + due_in, **fields)
+
+    def run_scheduler(self, iterations, on_sleep=None):
+        """Run the scheduler loop on a fake clock that each sleep advances."""
+        clock = [self.start]
+        sleeps = []
+
+        def sleep(seconds):
+            sleeps.append(seconds)
+            if on_sleep:
+                on_sleep(len(sleeps))
+            if len(sleeps) == iterations:
+                raise KeyboardInterrupt
+            clock[0] += timedelta(seconds=seconds)
+
+        module = "tasks.management.commands.run_reminder_scheduler"
+        with mock.patch(f"{module}.timezone.now", lambda: clock[0]), mock.patch(f"{module}.time.sleep", sleep):
+            call_command("run_reminder_scheduler", hours=1, poll_interval=3600, stdout=StringIO())
+        return sleeps
+
+    def test_reminders_fire_in_due_order(self):
+        self.task("Later", timedelta(hours=1, minutes=10))
+        self.task("Sooner", timedelta(hours=1, minutes=5))
+        self.task("Already in the window", timedelta(minutes=30))
+        self.task("Done", timedelta(minutes=30), completed=True)
+
+        sleeps = self.run_scheduler(iterations=3)
+
+        self.assertEqual(
+            [m.subject for m in mail.outbox],
+            [
+                "Reminder: 'Already in the window' is due soon",
+                "Reminder: 'Sooner' is due soon",
+                "Reminder: 'Later' is due soon",
+            ],
+        )
+        # Sleeps until the next reminder instead of a whole poll interval.
+        self.assertEqual(sleeps[:2], [300, 300])
+
+    def test_rescheduled_task_fires_at_its_new_time(self):
+        moved = self.task("Moved", timedelta(hours=1, minutes=5))
+        self.task("Stays", timedelta(hours=1, minutes=10))
+
+        def reschedule(iteration):
+            if iteration == 1:
+                moved.due_date = self.start + timedelta(hours=1, minutes=20)
+                moved.save()
+
+        self.run_scheduler(iterations=4, on_sleep=reschedule)
+
+        self.assertEqual(
+            [m.subject for m in mail.outbox],
+            ["Reminder: 'Stays' is due soon", "Reminder: 'Moved' is due soon"],
+        )
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class TaskSearchTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.milk = Task.objects.create(owner=self.user, title="Buy milk")
+        self.report = Task.objects.create(owner=self.user, title="Write the quarterly report")
+        Task.objects.create(owner=User.objects.create_user("bob"), title="Buy milk for bob")
+
+    def search(self, q):
+        return search_tasks(self.user, q)[0]
+
+    def test_owner_scoped_prefix_search(self):
+        self.assertTrue(has_search_index())
+        self.assertEqual(self.search("milk"), [self.milk])
+        self.assertEqual(self.search("quart rep"), [self.report])
+        self.assertEqual(self.search("milk report"), [])
+        self.assertEqual(self.search('" OR owner_id:'), [])
+
+    def test_soft_deleted_tasks_are_not_found(self):
+        Task.objects.filter(pk=self.milk.pk).soft_delete()
+        self.assertEqual(self.search("milk"), [])
+
+        Task.all_objects.filter(pk=self.milk.pk).restore()
+        self.assertEqual(self.search("milk"), [self.milk])
+
+    def test_renamed_task(self):
+        self.milk.title = "Buy bread"
+        self.milk.save()
+
+        self.assertEqual(self.search("milk"), [])
+        self.assertEqual(self.search("bread"), [self.milk])
+
+    def test_search_page(self):
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("tasks:task_search"), {"q": "milk"})
+
+        self.assertContains(response, "Buy milk")
+        self.assertNotContains(response, "for bob")
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class TaskListCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(owner=self.user, title="Original")
+
+    def get_list(self):
+        return self.client.get(reverse("tasks:task_list"))
+
+    def test_fragment_is_served_from_the_cache(self):
+        self.assertContains(self.get_list(), "Original")
+
+        # A write that skips the signals leaves the cached fragment in place.
+        Task.objects.filter(pk=self.task.pk).update(title="Changed")
+
+        self.assertContains(self.get_list(), "Original")
+
+    def test_save_invalidates_on_commit(self):
+        self.get_list()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.task.title = "Changed"
+            self.task.save()
+
+        self.assertContains(self.get_list(), "Changed")
+
+    def test_ajax_toggle_invalidates(self):
+        self.assertContains(self.get_list(), 'data-completed="false"')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse("tasks:toggle_task_ajax", args=[self.task.pk]))
+
+        self.assertContains(self.get_list(), 'data-completed="true"')
+
+    def test_other_users_are_not_invalidated(self):
+        self.get_list()
+        Task.objects.filter(pk=self.task.pk).update(title="Changed")
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Task.objects.create(owner=User.objects.create_user("bob"), title="Bob's")
+
+        self.assertContains(self.get_list(), "Original")
+
+
+class ToggleTaskAjaxTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+        self.client.force_login(self.user)
+        self.task = Task.objects.create(owner=self.user, title="A")
+
+    def toggle(self, **data):
+        return self.client.post(reverse("tasks:toggle_task_ajax", args=[self.task.pk]), data)
+
+    def test_flip_is_one_conditional_update(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.toggle(completed="false")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["task"]["completed"])
+        task_queries = [q["sql"] for q in queries.captured_queries if '"tasks_task"' in q["sql"]]
+        updates = [sql for sql in task_queries if sql.startswith("UPDATE")]
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"completed"', updates[0].split("WHERE")[1])
+        # The row is never loaded; only the validator aggregate reads the table.
+        self.assertEqual(len(task_queries), 2)
+
+    def test_stale_state_is_a_conflict(self):
+        Task.objects.filter(pk=self.task.pk).update(completed=True)
+
+        response = self.toggle(completed="false")
+
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(response.json(), {"status": "conflict", "task": {"id": self.task.pk, "completed": True}})
+        self.assertTrue(Task.objects.get(pk=self.task.pk).completed)
+
+    def test_without_expected_state_flips_in_sql(self):
+        self.assertTrue(self.toggle().json()["task"]["completed"])
+        self.assertFalse(self.toggle().json()["task"]["completed"])
+
+    def test_other_users_task_is_not_found(self):
+        self.client.force_login(User.objects.create_user("bob"))
+
+        self.assertEqual(self.toggle(completed="false").status_code, 404)
+        self.assertEqual(self.toggle().status_code, 404)
+        self.assertFalse(Task.objects.get(pk=self.task.pk).completed)
+
+
+# The task URLs served by tasks.async_views, for AsyncViewTests.
+urlpatterns = [
+    path("accounts/", include("accounts.urls")),
+    path("tasks/", include((task_urlpatterns(async_views), "tasks"), namespace="tasks")),
+]
+
+
+@override_settings(STORAGES=PLAIN_STATIC, ROOT_URLCONF=__name__, TASKS_PAGE_SIZE=2)
+class AsyncViewTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user("alice")
+        self.tasks = [Task.objects.create(owner=self.user, title=f"Task {i}") for i in range(3)]
+        self.client = AsyncClient()
+        self.client.force_login(self.user)
+
+    async def test_task_list_pages_and_not_modified(self):
+        response = await self.client.get(reverse("tasks:task_list"))
+        self.assertContains(response, "Task 1")
+        self.assertNotContains(response, "Task 2")
+
+        etag = (await self.client.get(reverse("tasks:task_list")))["ETag"]
+        response = await self.client.get(reverse("tasks:task_list"), headers={"if_none_match": etag})
+        self.assertEqual(response.status_code, 304)
+
+    async def test_json_api_follows_next_cursor(self):
+        data = (await self.client.get(reverse("tasks:task_list_json"))).json()
+        rest = (await self.client.get(reverse("tasks:task_list_json"), {"after": data["next_cursor"]})).json()
+
+        self.assertEqual([t["id"] for t in data["tasks"] + rest["tasks"]], [t.pk for t in self.tasks])
+        self.assertIsNone(rest["next_cursor"])
+
+    async def test_toggle_conflict(self):
+        url = reverse("tasks:toggle_task_ajax", args=[self.tasks[0].pk])
+
+        response = await self.client.post(url, {"completed": "false"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("ETag", response)
+
+        response = await self.client.post(url, {"completed": "false"})
+        self.assertEqual(response.status_code, 409)
+        self.assertTrue(response.json()["task"]["completed"])
+
+    async def test_delete_and_undo(self):
+        pk = self.tasks[0].pk
+
+        response = await self.client.post(reverse("tasks:delete_task_ajax", args=[pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(await Task.objects.filter(pk=pk).aexists())
+
+        response = await self.client.post(reverse("tasks:undo_delete", args=[pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(await Task.objects.filter(pk=pk).aexists())
+
+
+class TaskEventTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice")
+
+    def change(self, fn):
+        def run():
+            with self.captureOnCommitCallbacks(execute=True):
+                return fn()
+
+        return sync_to_async(run)()
+
+    async def next_event(self, stream):
+        return await asyncio.wait_for(anext(stream), 1)
+
+    async def test_stream_sends_the_owners_changes(self):
+        bob = await User.objects.acreate(username="bob")
+        stream = event_stream(self.user.pk)
+        self.assertEqual(await self.next_event(stream), "retry: 5000\n\n")
+
+        await self.change(lambda: Task.objects.create(owner=bob, title="Not yours"))
+        task = await self.change(lambda: Task.objects.create(owner=self.user, title="Mine"))
+        created = await self.next_event(stream)
+        self.assertIn("event: create\n", created)
+        self.assertIn("Mine", created)
+        self.assertNotIn("Not yours", created)
+
+        def soft_delete():
+            # Queryset writes notify explicitly, as the views do.
+            Task.objects.filter(pk=task.pk).soft_delete()
+            notify_task_changed(self.user.pk, [task.pk])
+
+        await self.change(soft_delete)
+        self.assertIn(f'event: delete\ndata: {{"id": {task.pk}}}', await self.next_event(stream))
+
+        await stream.aclose()
+        self.assertFalse(has_subscribers(self.user.pk))
+
+    def test_nothing_is_queued_without_subscribers(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            notify_task_changed(self.user.pk, [1])
+            notify_refresh(self.user.pk)
+
+        self.assertEqual(callbacks, [])
+
+    async def test_stalled_stream_is_told_to_refresh(self):
+        subscription = subscribe(self.user.pk)
+        try:
+            for i in range(MAX_PENDING_EVENTS + 1):
+                publish(self.user.pk, "update", {"id": i})
+            await asyncio.sleep(0)
+
+            self.assertEqual(subscription.queue.qsize(), 1)
+            self.assertEqual(subscription.queue.get_nowait()["event"], "refresh")
+        finally:
+            unsubscribe(subscription)
+
+    def test_wsgi_view_declines_the_stream(self):
+        self.client.force_login(self.user)
+
+        self.assertEqual(self.client.get(reverse("tasks:task_events")).status_code, 204)
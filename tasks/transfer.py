@@ -0,0 +1,206 @@
+"""Bulk export and import of a user's tasks, as CSV or NDJSON.
+
+Both directions stream: exports are generated row by row from a database
+iterator, and imports read the upload a line at a time and insert it in
+fixed-size batches, so memory use does not grow with the number of tasks.
+"""
+import csv
+import json
+
+from django.db import transaction
+
+from .forms import TaskImportForm
+from .models import Task
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
+
+EXPORT_FIELDS = ("id", "title", "completed", "due_date", "priority", "created_at", "updated_at")
+
+# Exported rows per chunk of the streamed response.
+EXPORT_CHUNK_ROWS = 500
+
+IMPORT_BATCH_SIZE = 500
+
+# Rows with errors beyond this many are counted but not described.
+MAX_REPORTED_ERRORS = 1000
+
+TRUE_VALUES = {"true", "1", "yes", "y"}
+FALSE_VALUES = {"false", "0", "no", "n", ""}
+
+
+class TransferError(ValueError):
+    """Raised when the upload as a whole can't be read (not for bad rows).
+
+    `report` is set when the error came partway through an import: the
+    import_tasks report for the rows before it, which are saved.
+    """
+
+    report = None
+
+
+def guess_format(filename, requested=None):
+    """The import/export format from an explicit choice or the file extension."""
+    fmt = (requested or "").lower() or (filename or "").rsplit(".", 1)[-1].lower()
+    if fmt in ("json", "jsonl"):
+        fmt = "ndjson"
+    if fmt not in FORMATS:
+        raise TransferError(f"Unsupported format; use one of: {', '.join(FORMATS)}")
+    return fmt
+
+
+def _export_value(value):
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    return value
+
+
+def _csv_value(value):
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    return "" if value is None else _export_value(value)
+
+
+class _Echo:
+    # csv.writer wants a file; hand each formatted line straight back.
+    def write(self, value):
+        return value
+
+
+def export_tasks(queryset, fmt):
+    """Yield `queryset`'s tasks as chunks of CSV or NDJSON text."""
+    rows = queryset.order_by("pk").values_list(*EXPORT_FIELDS).iterator(chunk_size=2000)
+    if fmt == "csv":
+        writer = csv.writer(_Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        format_row = lambda row: writer.writerow([_csv_value(v) for v in row])
+    else:
+        format_row = lambda row: json.dumps(dict(zip(EXPORT_FIELDS, map(_export_value, row)))) + "\n"
+
+    chunk = []
+    for row in rows:
+        chunk.append(format_row(row))
+        if len(chunk) >= EXPORT_CHUNK_ROWS:
+            yield "".join(chunk)
+            chunk = []
+    if chunk:
+        yield "".join(chunk)
+
+
+def _decoded_lines(stream):
+    """Yield the lines of the binary `stream` as text, decoding one line at a time.
+
+    Decoding per line (rather than through a TextIOWrapper, which decodes in
+    blocks) means a bad byte stops the import exactly at its line.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        try:
+            yield line.decode("utf-8-sig" if line_number == 1 else "utf-8")
+        except UnicodeDecodeError:
+            raise TransferError(f"The file must be UTF-8 encoded (line {line_number} is not)")
+
+
+def _read_rows(stream, fmt):
+    """Yield (line number, row dict or error message) from the binary `stream`."""
+    lines = _decoded_lines(stream)
+    if fmt == "csv":
+        reader = csv.DictReader(lines)
+        try:
+            if not reader.fieldnames or "title" not in reader.fieldnames:
+                raise TransferError("The CSV header must include a 'title' column")
+            for row in reader:
+                yield reader.line_num, row
+        except csv.Error as e:
+            raise TransferError(f"Unreadable CSV at line {reader.line_num}: {e}")
+    else:
+        for line_number, line in enumerate(lines, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                yield line_number, "Invalid JSON"
+                continue
+            yield line_number, row if isinstance(row, dict) else "Each line must be a JSON object"
+
+
+def _errors(form, **extra):
+    return {**{field: list(messages) for field, messages in form.errors.items()}, **extra}
+
+
+def _build_task(owner, row):
+    """Return (task, None) for a valid row, or (None, errors)."""
+    form = TaskImportForm(
+        {
+            "title": row.get("title"),
+            "due_date": row.get("due_date") or None,
+            "priority": row.get("priority") or "medium",
+        }
+    )
+    completed = row.get("completed")
+    if not isinstance(completed, bool):
+        completed = str(completed if completed is not None else "").strip().lower()
+        if completed not in TRUE_VALUES | FALSE_VALUES:
+            form.is_valid()
+            return None, _errors(form, completed=["Expected true or false."])
+        completed = completed in TRUE_VALUES
+    if not form.is_valid():
+        return None, _errors(form)
+    task = form.save(commit=False)
+    task.owner = owner
+    task.completed = completed
+    return task, None
+
+
+def import_tasks(owner, stream, fmt, batch_size=IMPORT_BATCH_SIZE):
+    """Create tasks for `owner` from the CSV/NDJSON binary `stream`.
+
+    Every row is validated with TaskImportForm (TaskForm's rules, past due
+    dates allowed). Valid rows are inserted with bulk_create, `batch_size`
+    at a time, one transaction per batch; invalid rows are skipped. Returns
+    a report dict: counts plus one entry per bad row (up to
+    MAX_REPORTED_ERRORS), identified by its line number.
+
+    The file is read as it is imported, so an unreadable line (bad UTF-8,
+    broken CSV) may only turn up after earlier batches are committed. The
+    valid rows before it are saved too, and the TransferError carries the
+    report for them.
+
+    Like apply_batch, this bypasses the Task signals; callers refresh the
+    owner's task list cache and live views, also after a TransferError
+    with a report.
+    """
+    created = failed = 0
+    errors = []
+    pending = []
+
+    def flush():
+        nonlocal created
+        with transaction.atomic():
+            Task.objects.bulk_create(pending)
+        created += len(pending)
+        pending.clear()
+
+    def report():
+        return {"created": created, "failed": failed, "errors": errors, "errors_truncated": failed > len(errors)}
+
+    try:
+        for line, row in _read_rows(stream, fmt):
+            task, row_errors = (None, {"__all__": [row]}) if isinstance(row, str) else _build_task(owner, row)
+            if task is None:
+                failed += 1
+                if len(errors) < MAX_REPORTED_ERRORS:
+                    errors.append({"line": line, "errors": row_errors})
+                continue
+            pending.append(task)
+            if len(pending) >= batch_size:
+                flush()
+    except TransferError as e:
+        if pending:
+            flush()
+        e.report = report()
+        raise
+    if pending:
+        flush()
+
+    return report()
@@ -1,12 +1,27 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = "tasks"
 
-urlpatterns = [
-    path("", views.task_list, name="task_list"),
-    path("toggle/<int:pk>/", views.toggle_task, name="toggle_task"),
-    path("delete/<int:pk>/", views.delete_task, name="delete_task"),
-    path("delete_ajax/<int:pk>/", views.delete_task_ajax, name="delete_task_ajax"),
-    path("undo_create/", views.undo_create, name="undo_create"),
-]
+
+def task_urlpatterns(views):
+    """URL patterns for `views`: tasks.views, or tasks.async_views under ASGI."""
+    return [
+        path("", views.task_list, name="task_list"),
+        path("search/", views.task_search, name="task_search"),
+        path("toggle/<int:pk>/", views.toggle_task, name="toggle_task"),
+        path("toggle_ajax/<int:pk>/", views.toggle_task_ajax, name="toggle_task_ajax"),
+        path("delete/<int:pk>/", views.delete_task, name="delete_task"),
+        path("delete_ajax/<int:pk>/", views.delete_task_ajax, name="delete_task_ajax"),
+        path("undo_delete/<int:pk>/", views.undo_delete, name="undo_delete"),
+        path("api/tasks/", views.task_list_json, name="task_list_json"),
+        path("api/batch/", views.task_batch, name="task_batch"),
+        path("export/", views.task_export, name="task_export"),
+        path("import/", views.task_import, name="task_import"),
+        # Always async: an event stream is one long-lived request per open tab.
+        path("events/", async_views.task_events, name="task_events"),
+    ]
+
+
+urlpatterns = task_urlpatterns(async_views if getattr(settings, "TASKS_ASYNC_VIEWS", False) else views)
@@ -1,20 +1,62 @@
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.middleware.csrf import get_token
 from django.shortcuts import render, redirect, get_object_or_404
+from django.template.loader import render_to_string
+from django.utils import timezone
+from django.utils.safestring import mark_safe
+from django.views.decorators.http import condition
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import JsonResponse, HttpResponseBadRequest
+from django.http import Http404, JsonResponse, HttpResponseBadRequest, StreamingHttpResponse
 from .models import Task
+from .batch import TOGGLE_COMPLETED, BatchError, apply_batch
+from .cache import TASK_LIST_CACHE_TIMEOUT, bump_task_list_version, task_list_fragment_key
+from .conditional import (
+    add_validators,
+    task_json_etag,
+    task_json_last_modified,
+    task_list_etag,
+    task_list_last_modified,
+)
+from .events import notify_refresh, notify_task_changed
 from .forms import TaskForm
+from .pagination import DEFAULT_PAGE_SIZE, paginate_tasks
+from .search import search_tasks
+from .transfer import CONTENT_TYPES, TransferError, export_tasks, guess_format, import_tasks
+
+
+def _tasks_changed(owner_id, pks, kind="update"):
+    """What the Task signals would do, for changes made with queryset update()."""
+    bump_task_list_version(owner_id)
+    notify_task_changed(owner_id, pks, kind)
+
+
+def _task_json(task):
+    return {
+        'id': task.pk,
+        'title': task.title,
+        'completed': task.completed,
+        'due_date': task.due_date.isoformat() if task.due_date else None,
+        'priority': task.priority,
+        'updated_at': task.updated_at.isoformat() if task.updated_at else None,
+    }
 
 
 @login_required
+@condition(etag_func=task_list_etag, last_modified_func=task_list_last_modified)
 def task_list(request):
     """Display tasks for the logged-in user and handle creation.
 
     Only tasks owned by request.user are shown. New tasks are saved with
-    owner=request.user.
+    owner=request.user. The list is keyset-paginated on (completed, due_date,
+    id); pass the ``after`` cursor from the previous page to continue.
+    The rendered list is cached per user and page until their tasks change,
+    and conditional GETs are answered with 304 from a single aggregate.
     """
     form = TaskForm(request.POST or None)
-    tasks = Task.objects.filter(owner=request.user).order_by("completed", "due_date")
 
     if request.method == "POST":
         if form.is_valid():
@@ -24,7 +66,57 @@ def task_list(request):
             messages.success(request, "Task added.")
             return redirect("tasks:task_list")
 
-    return render(request, "tasks/task_list.html", {"tasks": tasks, "form": form})
+    cursor = request.GET.get("after")
+    get_token(request)  # the CSRF secret must exist before it goes into the cache key
+    key = task_list_fragment_key(request.user.pk, cursor, request.META["CSRF_COOKIE"])
+    task_items = cache.get(key)
+    if task_items is None:
+        page_size = getattr(settings, "TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+        tasks, next_cursor = paginate_tasks(
+            Task.objects.filter(owner=request.user), cursor=cursor, page_size=page_size
+        )
+        task_items = render_to_string(
+            "tasks/includes/task_items.html",
+            {"tasks": tasks, "next_cursor": next_cursor, "is_first_page": not cursor},
+            request=request,
+        )
+        cache.set(key, task_items, TASK_LIST_CACHE_TIMEOUT)
+
+    return render(request, "tasks/task_list.html", {"form": form, "task_items": mark_safe(task_items)})
+
+
+@login_required
+@condition(etag_func=task_json_etag, last_modified_func=task_json_last_modified)
+def task_list_json(request):
+    """JSON version of the task list, keyset-paginated with the same ``after`` cursor.
+
+    Answers If-None-Match / If-Modified-Since with 304 when nothing changed.
+    """
+    cursor = request.GET.get('after')
+    page_size = getattr(settings, "TASKS_PAGE_SIZE", DEFAULT_PAGE_SIZE)
+    tasks, next_cursor = paginate_tasks(Task.objects.filter(owner=request.user), cursor=cursor, page_size=page_size)
+    return JsonResponse({'tasks': [_task_json(task) for task in tasks], 'next_cursor': next_cursor})
+
+
+@login_required
+def task_search(request):
+    """Search the current user's task titles (ranked, page-numbered results)."""
+    q = (request.GET.get("q") or "").strip()
+    try:
+        page = max(1, int(request.GET.get("page") or 1))
+    except ValueError:
+        page = 1
+
+    tasks, has_next = search_tasks(request.user, q, page=page) if q else ([], False)
+    context = {
+        "tasks": tasks,
+        "form": TaskForm(),
+        "q": q,
+        "search_page": page,
+        "search_has_next": has_next,
+        "is_first_page": True,
+    }
+    return render(request, "tasks/task_list.html", context)
 
 
 @login_required
@@ -38,54 +130,165 @@ def toggle_task(request, pk):
 
     task = get_object_or_404(Task, pk=pk, owner=request.user)
     task.completed = not task.completed
-    task.save(update_fields=["completed"])
+    task.save(update_fields=["completed", "updated_at"])
     return redirect("tasks:task_list")
 
 
+@login_required
+def toggle_task_ajax(request, pk):
+    """Toggle completion via AJAX and return the new state as JSON. Expects POST.
+
+    The client may send ``completed`` (the state it is showing); the flip is
+    then a single conditional UPDATE that only applies if that state is still
+    current. Without it the flip is done in SQL and the new value read back.
+    Either way the task row is never loaded into a model instance.
+    """
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    tasks = Task.objects.filter(pk=pk, owner=request.user)
+    now = timezone.now()
+    expected = request.POST.get('completed')
+    if expected in ('true', 'false'):
+        was_completed = expected == 'true'
+        updated = tasks.filter(completed=was_completed).update(completed=not was_completed, updated_at=now)
+        if updated:
+            completed = not was_completed
+        else:
+            # Missing, or changed elsewhere since the page was rendered: report the real state.
+            current = tasks.values_list('completed', flat=True).first()
+            if current is None:
+                return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+            return JsonResponse({'status': 'conflict', 'task': {'id': pk, 'completed': current}}, status=409)
+    else:
+        if not tasks.update(completed=TOGGLE_COMPLETED, updated_at=now):
+            return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+        completed = tasks.values_list('completed', flat=True).first()
+
+    _tasks_changed(request.user.pk, [pk])
+    data = {'id': pk, 'completed': completed, 'updated_at': now.isoformat()}
+    return add_validators(JsonResponse({'status': 'ok', 'task': data}), request.user)
+
+
 @login_required
 def delete_task(request, pk):
-    """Delete a task owned by the current user (POST only)."""
+    """Soft-delete a task owned by the current user (POST only)."""
     if request.method != "POST":
         return redirect("tasks:task_list")
 
-    task = get_object_or_404(Task, pk=pk, owner=request.user)
-    task.delete()
+    if not Task.objects.filter(pk=pk, owner=request.user).soft_delete():
+        raise Http404("No Task matches the given query.")
+    _tasks_changed(request.user.pk, [pk])
     messages.success(request, "Task deleted.")
     return redirect("tasks:task_list")
 
 
 @login_required
 def delete_task_ajax(request, pk):
-    """Delete task via AJAX and return JSON. Expects POST."""
+    """Soft-delete a task via AJAX and return JSON. Expects POST.
+
+    The row is only tombstoned, so undo_delete can bring it back unchanged.
+    """
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid request')
 
-    task = get_object_or_404(Task, pk=pk, owner=request.user)
-    # Return task data so client can offer undo
-    data = {'id': task.pk, 'title': task.title, 'due_date': task.due_date.isoformat() if task.due_date else None, 'priority': task.priority}
-    task.delete()
-    return JsonResponse({'status': 'ok', 'task': data})
+    if not Task.objects.filter(pk=pk, owner=request.user).soft_delete():
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    _tasks_changed(request.user.pk, [pk])
+    return add_validators(JsonResponse({'status': 'ok', 'task': {'id': pk}}), request.user)
+
+
+@login_required
+def undo_delete(request, pk):
+    """Restore a soft-deleted task (used for undo). Expects POST."""
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    if not Task.all_objects.filter(pk=pk, owner=request.user).restore():
+        return JsonResponse({'status': 'error', 'message': 'Task not found'}, status=404)
+    _tasks_changed(request.user.pk, [pk], "create")
+    return add_validators(JsonResponse({'status': 'ok', 'task_id': pk}), request.user)
+
+
+@login_required
+def task_batch(request):
+    """Apply a batch of task operations sent as JSON. Expects POST.
+
+    Body: {"operations": [{"op": "create", "title": ..., "due_date": ..., "priority": ...},
+    {"op": "toggle", "id": ...}, {"op": "set_priority", "id": ..., "priority": ...},
+    {"op": "delete", "id": ...}, {"op": "complete_all"}, {"op": "clear_completed"}]}.
+    The whole batch runs in one transaction and the response carries one
+    result per operation, in request order.
+    """
+    if request.method != 'POST':
+        return HttpResponseBadRequest('Invalid request')
+
+    try:
+        payload = json.loads(request.body or b'{}')
+        results = apply_batch(request.user, payload.get('operations'))
+    except (ValueError, AttributeError) as e:
+        message = str(e) if isinstance(e, BatchError) else 'Invalid JSON body'
+        return JsonResponse({'status': 'error', 'message': message}, status=400)
+
+    # bulk_create() and queryset update() bypass the Task signals.
+    bump_task_list_version(request.user.pk)
+    applied = [r for r in results if r['status'] == 'ok']
+    if any(r['op'] in ('complete_all', 'clear_completed') for r in applied):
+        notify_refresh(request.user.pk)
+    else:
+        notify_task_changed(request.user.pk, [r['id'] for r in applied if r['op'] == 'create'], "create")
+        notify_task_changed(request.user.pk, {r['id'] for r in applied if r['op'] != 'create'})
+
+    return add_validators(JsonResponse({'status': 'ok', 'results': results}), request.user)
 
 
 @login_required
-def undo_create(request):
-    """Recreate a task sent by the client (used for undo). Expects POST JSON with title, due_date (ISO) and priority."""
+def task_export(request):
+    """Download the current user's tasks; ``?format=csv`` (default) or ``ndjson``.
+
+    Streamed straight from a database iterator, so any number of tasks
+    exports in constant memory.
+    """
+    try:
+        fmt = guess_format(None, request.GET.get('format') or 'csv')
+    except TransferError as e:
+        return HttpResponseBadRequest(str(e))
+
+    response = StreamingHttpResponse(
+        export_tasks(Task.objects.filter(owner=request.user), fmt), content_type=CONTENT_TYPES[fmt]
+    )
+    response['Content-Disposition'] = f'attachment; filename="tasks.{fmt}"'
+    return response
+
+
+@login_required
+def task_import(request):
+    """Create tasks from an uploaded CSV or NDJSON ``file``. Expects POST.
+
+    The format comes from ``format`` or the file extension. Valid rows are
+    imported even if others fail; the response lists the failures by line.
+    If the file turns out unreadable partway, the rows before that point
+    stay imported: the 400 response then has status "partial" and the
+    report for them.
+    """
     if request.method != 'POST':
         return HttpResponseBadRequest('Invalid request')
 
-    title = request.POST.get('title')
-    due = request.POST.get('due_date')
-    priority = request.POST.get('priority') or 'medium'
-    if not title:
-        return JsonResponse({'status': 'error', 'message': 'Missing title'}, status=400)
-
-    task = Task.objects.create(owner=request.user, title=title, priority=priority)
-    # parse due if provided
-    if due:
-        from django.utils.dateparse import parse_datetime
-        dt = parse_datetime(due)
-        if dt:
-            task.due_date = dt
-            task.save(update_fields=['due_date'])
-
-    return JsonResponse({'status': 'ok', 'task_id': task.pk})
+    upload = request.FILES.get('file')
+    if upload is None:
+        return JsonResponse({'status': 'error', 'message': 'No file uploaded'}, status=400)
+    try:
+        fmt = guess_format(upload.name, request.POST.get('format'))
+        report = import_tasks(request.user, upload.file, fmt)
+        error = None
+    except TransferError as e:
+        report, error = e.report, str(e)
+
+    if report and report['created']:
+        # bulk_create() bypasses the Task signals; too many rows to push one by one.
+        bump_task_list_version(request.user.pk)
+        notify_refresh(request.user.pk)
+    if error is None:
+        return JsonResponse({'status': 'ok', **report})
+    status = 'partial' if report and report['created'] else 'error'
+    return JsonResponse({'status': status, 'message': error, **(report or {})}, status=400)
@@ -13,4 +13,10 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'todo.settings')
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# Imported after setup: it reverses URLs. Serves the task event stream
+# without holding a thread per open connection; see tasks/asgi.py.
+from tasks.asgi import TaskEventsApp  # noqa: E402
+
+application = TaskEventsApp(django_application)
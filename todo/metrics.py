@@ -0,0 +1,175 @@
+"""Per-request SQL and latency instrumentation, on when REQUEST_METRICS is set.
+
+RequestMetricsMiddleware times every request and, through
+connection.execute_wrapper, the queries it runs. It then:
+
+- adds a Server-Timing header (db / app), which browser dev tools show
+  next to the request;
+- logs requests slower than REQUEST_METRICS_SLOW_MS to "todo.metrics",
+  with their slowest query;
+- adds the timings to per-route histograms, served in the Prometheus text
+  format by metrics_view (admin only).
+
+Histograms live in the process, so with several workers each one reports
+its own, and they reset on restart. Prometheus' rate()/histogram_quantile()
+handle both.
+
+Streaming responses (task exports, the SSE change feed) are left out: their
+body, and the queries feeding it, runs after the middleware returns, so
+both the header and the histograms would only cover the setup.
+"""
+import logging
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from accounts.views import admin_required
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the histogram buckets; +Inf is implied.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)  # seconds
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Logged slow queries are cut to this many characters.
+MAX_LOGGED_SQL = 1000
+
+
+class Histogram:
+    """A Prometheus histogram with (route, method) labels."""
+
+    def __init__(self, name, documentation, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = buckets
+        # labels -> [per-bucket counts..., sum, count]
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, labels, value):
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * (len(self.buckets) + 2)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self):
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for (route, method), values in sorted(series.items()):
+            labels = f'route="{_escape(route)}",method="{_escape(method)}"'
+            for bound, count in zip(self.buckets, values):
+                lines.append(f'{self.name}_bucket{{{labels},le="{bound}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{labels},le="+Inf"}} {values[-1]}')
+            lines.append(f"{self.name}_sum{{{labels}}} {values[-2]:g}")
+            lines.append(f"{self.name}_count{{{labels}}} {values[-1]}")
+        return "\n".join(lines)
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_DURATION = Histogram(
+    "todo_http_request_duration_seconds", "Time to produce the response, by route.", LATENCY_BUCKETS
+)
+REQUEST_DB_DURATION = Histogram(
+    "todo_http_request_db_duration_seconds", "Time spent in SQL per request, by route.", LATENCY_BUCKETS
+)
+REQUEST_DB_QUERIES = Histogram(
+    "todo_http_request_db_queries", "SQL queries per request, by route.", QUERY_BUCKETS
+)
+HISTOGRAMS = (REQUEST_DURATION, REQUEST_DB_DURATION, REQUEST_DB_QUERIES)
+
+
+class QueryRecorder:
+    """execute_wrapper that counts and times queries, keeping the slowest."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+        self.slowest = (0.0, None)
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.count += 1
+            self.duration += elapsed
+            if elapsed >= self.slowest[0]:
+                self.slowest = (elapsed, sql)
+
+
+def _route(request):
+    match = getattr(request, "resolver_match", None)
+    # The URL name, not the path, so the number of series stays bounded.
+    return match.view_name if match is not None else "<unmatched>"
+
+
+class RequestMetricsMiddleware:
+    """Times each request and its SQL; see the module docstring.
+
+    Synchronous only: the query wrapper is installed on the connections of
+    the thread that runs the view. With TASKS_ASYNC_VIEWS, Django runs the
+    async views through a thread for it while metrics are on.
+    """
+
+    def __init__(self, get_response):
+        if not getattr(settings, "REQUEST_METRICS", False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = getattr(settings, "REQUEST_METRICS_SLOW_MS", 500)
+
+    def __call__(self, request):
+        recorder = QueryRecorder()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        if response.streaming:
+            return response
+
+        labels = (_route(request), request.method)
+        REQUEST_DURATION.observe(labels, elapsed)
+        REQUEST_DB_DURATION.observe(labels, recorder.duration)
+        REQUEST_DB_QUERIES.observe(labels, recorder.count)
+
+        response["Server-Timing"] = (
+            f'db;dur={recorder.duration * 1000:.1f};desc="{recorder.count} queries", '
+            f"app;dur={elapsed * 1000:.1f}"
+        )
+        if elapsed * 1000 >= self.slow_ms:
+            slowest_time, slowest_sql = recorder.slowest
+            logger.warning(
+                "Slow request %s %s (%s): %.0fms, %d queries in %.0fms; slowest query %.0fms: %s",
+                request.method,
+                request.path,
+                labels[0],
+                elapsed * 1000,
+                recorder.count,
+                recorder.duration * 1000,
+                slowest_time * 1000,
+                (slowest_sql or "-")[:MAX_LOGGED_SQL],
+            )
+        return response
+
+
+@admin_required
+def metrics_view(request):
+    """The request histograms in the Prometheus text exposition format."""
+    body = "\n".join(histogram.render() for histogram in HISTOGRAMS) + "\n"
+    return HttpResponse(body, content_type="text/plain; version=0.0.4; charset=utf-8")
@@ -10,8 +10,11 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
+from .sqlite import init_command as sqlite_init_command
+
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent
 
@@ -45,6 +48,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'todo.metrics.RequestMetricsMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -84,6 +89,29 @@ DATABASES = {
     }
 }
 
+# SQLite tuning profile (see todo/sqlite.py): 'default' is stock SQLite,
+# 'production' turns on WAL, a busy timeout, mmap and persistent connections
+# for running several workers against the same file.
+SQLITE_PROFILE = os.environ.get('TODO_SQLITE_PROFILE', 'default')
+DATABASES['default']['OPTIONS'] = {'init_command': sqlite_init_command(SQLITE_PROFILE)}
+
+if SQLITE_PROFILE == 'production':
+    DATABASES['default'].update(CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True)
+    # Take the write lock at BEGIN, so a transaction waits out the busy
+    # timeout up front instead of failing when it first writes.
+    DATABASES['default']['OPTIONS']['transaction_mode'] = 'IMMEDIATE'
+
+# Serve the async task views (tasks/async_views.py). Only worth it under an
+# ASGI server such as `uvicorn todo.asgi:application`; under WSGI each async
+# view would need its own event loop.
+TASKS_ASYNC_VIEWS = os.environ.get('TODO_ASYNC_VIEWS') == '1'
+
+# Per-request query counts and timings (todo/metrics.py): a Server-Timing
+# header, a warning log for requests slower than REQUEST_METRICS_SLOW_MS,
+# and per-route histograms at /metrics for admins.
+REQUEST_METRICS = os.environ.get('TODO_REQUEST_METRICS') == '1'
+REQUEST_METRICS_SLOW_MS = int(os.environ.get('TODO_REQUEST_METRICS_SLOW_MS', 500))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -120,6 +148,17 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/5.2/howto/static-files/
 
 STATIC_URL = 'static/'
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+# static/css/app.css is built from assets/css/app.css (`npm run build:css`).
+STATICFILES_DIRS = [BASE_DIR / 'static']
+
+# `collectstatic` writes content-hashed copies plus .gz (and .br, with the
+# Brotli package) versions, which WhiteNoise serves with far-future cache
+# headers. Outside DEBUG, run collectstatic before serving.
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'whitenoise.storage.CompressedManifestStaticFilesStorage'},
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
@@ -146,3 +185,21 @@ INSTALLED_APPS = [
 # User uploads (e.g., avatar)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"  # from pathlib import Path; BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Keep the admin dashboard user counts in the cache, maintained by User
+# signals, instead of aggregating them on every view (see accounts.stats).
+ACCOUNTS_USER_STATS_CACHE = False
+
+# Cache used for profiles, role checks and rendered task lists. LocMemCache is
+# per process; with several workers switch to a shared backend such as
+# 'django.core.cache.backends.filebased.FileBasedCache' with
+# LOCATION = BASE_DIR / '.cache', so invalidations reach every worker.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'todo',
+    }
+}
+TASK_LIST_CACHE_TIMEOUT = 60 * 5
+# Soft-deleted tasks older than this are hard-deleted by `manage.py purge_deleted_tasks`.
+TASK_TOMBSTONE_RETENTION_DAYS = 30
@@ -0,0 +1,6 @@
+"""Helpers shared by the apps' test suites."""
+from django.conf import settings
+
+# STORAGES with plain static files, so pages render without running
+# collectstatic first (the manifest storage needs its manifest).
+PLAIN_STATIC = {**settings.STORAGES, "staticfiles": {"BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"}}
@@ -0,0 +1,100 @@
+import importlib
+import os
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import clear_url_caches, reverse
+
+from accounts.forms import ADMIN_GROUP_NAME, ensure_group
+
+from . import urls
+from .metrics import REQUEST_DURATION
+from .sqlite import init_command
+from .testing import PLAIN_STATIC
+
+User = get_user_model()
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    def test_production_pragmas_apply_to_new_connections(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            wrapper = DatabaseWrapper(
+                {
+                    **connection.settings_dict,
+                    "NAME": os.path.join(tmp, "db.sqlite3"),
+                    "OPTIONS": {"init_command": init_command("production")},
+                },
+                alias="sqlite_profile",
+            )
+            try:
+                self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+                self.assertEqual(self.pragma(wrapper, "busy_timeout"), 20000)
+                self.assertEqual(self.pragma(wrapper, "synchronous"), 1)  # NORMAL
+            finally:
+                wrapper.close()
+
+    def test_default_profile_changes_nothing(self):
+        self.assertEqual(init_command("default"), "")
+
+    def test_unknown_profile(self):
+        with self.assertRaises(ImproperlyConfigured):
+            init_command("fast")
+
+
+def _reload_urls():
+    importlib.reload(urls)
+    clear_url_caches()
+
+
+@override_settings(STORAGES=PLAIN_STATIC)
+class RequestMetricsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user("admin1")
+        self.admin.groups.add(ensure_group(ADMIN_GROUP_NAME))
+        self.client.force_login(self.admin)
+
+    def enable_metrics(self):
+        metrics_settings = override_settings(REQUEST_METRICS=True)
+        metrics_settings.enable()
+        self.addCleanup(_reload_urls)
+        self.addCleanup(metrics_settings.disable)
+        _reload_urls()
+
+    def test_off_by_default(self):
+        self.assertEqual(self.client.get("/metrics").status_code, 404)
+        self.assertNotIn("Server-Timing", self.client.get(reverse("tasks:task_list")))
+
+    def test_timings_and_histograms(self):
+        self.enable_metrics()
+
+        response = self.client.get(reverse("tasks:task_list"))
+
+        self.assertRegex(response["Server-Timing"], r'^db;dur=[\d.]+;desc="\d+ queries", app;dur=[\d.]+$')
+        body = self.client.get(reverse("metrics")).content.decode()
+        self.assertIn('todo_http_request_duration_seconds_count{route="tasks:task_list",method="GET"}', body)
+        self.assertIn("todo_http_request_db_queries_bucket", body)
+
+    def test_streamed_responses_are_skipped(self):
+        self.enable_metrics()
+        self.assertIn("Server-Timing", self.client.get(reverse("tasks:task_list")))
+
+        response = self.client.get(reverse("tasks:task_export"))
+        b"".join(response.streaming_content)
+
+        self.assertNotIn("Server-Timing", response)
+        self.assertNotIn('route="tasks:task_export"', REQUEST_DURATION.render())
+
+    def test_metrics_require_an_admin(self):
+        self.enable_metrics()
+        self.client.force_login(User.objects.create_user("bob"))
+
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 302)
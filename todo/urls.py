@@ -4,6 +4,8 @@ from django.conf.urls.static import static
 from django.urls import path, include
 from django.views.generic import TemplateView
 
+from .metrics import metrics_view
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("", TemplateView.as_view(template_name='landing.html'), name='landing'),
@@ -11,5 +13,8 @@ urlpatterns = [
     path("tasks/", include(("tasks.urls", "tasks"), namespace="tasks")),  # add this line with namespace
 ]
 
+if settings.REQUEST_METRICS:
+    urlpatterns += [path("metrics", metrics_view, name="metrics")]
+
 if settings.DEBUG:
     urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)